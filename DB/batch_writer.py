@@ -0,0 +1,147 @@
+import hashlib
+import os
+import time
+
+import psycopg2
+from psycopg2.errors import UniqueViolation
+from psycopg2.extras import execute_values
+
+from db_setup import connection
+
+# Rows per UPDATE ... FROM (and per commit)
+WRITE_BATCH_ROWS = int(os.environ.get("WRITE_BATCH_ROWS", 1000))
+# Attempts per batch on connection loss, deadlock or serialization failure
+WRITE_RETRIES = int(os.environ.get("WRITE_RETRIES", 3))
+WRITE_RETRY_DELAY = float(os.environ.get("WRITE_RETRY_DELAY", 1.0))
+
+RETRYABLE_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError, psycopg2.extensions.TransactionRollbackError)
+
+
+class BatchWriter:
+    """
+    Accumulates per-row updates of a table and applies them a batch at a
+    time: the rows go into a temporary table with one execute_values call
+    and are merged with a single UPDATE ... FROM join, then committed.
+    Within a batch the last update of a key wins, like consecutive
+    UPDATE statements would. A batch that violates a unique index (e.g. the
+    normalized key, when updating name/city/state/country) is retried row
+    by row, so only the conflicting rows are skipped.
+
+        with BatchWriter(["tags", "adventure"]) as writer:
+            writer.add(dest_id, [tags, adventure])
+
+    By default every batch checks out its own pooled connection, so a batch
+    that lost its connection is retried on a fresh one. Given a conn, the
+    batches are committed on it instead (along with anything else pending
+    on it) and only failures that leave it open are retried.
+    """
+
+    def __init__(self, columns, key="id", table="destinations", batch_size=None,
+                 retries=WRITE_RETRIES, on_batch=None, label="rows", conn=None):
+        self.conn = conn
+        self.columns = list(columns)
+        self.key = key
+        self.table = table
+        self.batch_size = batch_size or WRITE_BATCH_ROWS
+        self.retries = retries
+        self.on_batch = on_batch
+        self.label = label
+        self.pending = {}
+        self.stats = {"rows": 0, "batches": 0, "retries": 0, "conflicts": 0, "seconds": 0.0}
+
+        selected = ", ".join([key] + self.columns)
+        # One table per column set: pooled sessions reuse it across writers
+        updates = f"{table}_updates_{hashlib.md5(selected.encode()).hexdigest()[:8]}"
+        # Same column types as the target; emptied at commit so pooled sessions can reuse it
+        self.create_sql = (f"CREATE TEMP TABLE IF NOT EXISTS {updates} ON COMMIT DELETE ROWS AS "
+                           f"SELECT {selected} FROM {table} WITH NO DATA")
+        self.truncate_sql = f"TRUNCATE {updates}"
+        self.insert_sql = f"INSERT INTO {updates} ({selected}) VALUES %s"
+        assignments = ", ".join(f"{c} = u.{c}" for c in self.columns)
+        self.update_sql = f"UPDATE {table} AS t SET {assignments} FROM {updates} AS u WHERE t.{key} = u.{key}"
+
+    def add(self, key, values):
+        """
+        Queues one row update (values parallel to columns); writes a batch once batch_size rows are queued.
+        """
+        self.pending.pop(key, None)
+        self.pending[key] = list(values)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        rows = [[key] + values for key, values in self.pending.items()]
+        self.pending = {}
+        started = time.time()
+        for attempt in range(1, self.retries + 1):
+            try:
+                if self.conn is None:
+                    with connection() as conn:
+                        updated = self._apply(conn, rows)
+                else:
+                    updated = self._apply(self.conn, rows)
+                break
+            except RETRYABLE_ERRORS as e:
+                if self.conn is not None and not self.conn.closed:
+                    self.conn.rollback()
+                if attempt == self.retries or (self.conn is not None and self.conn.closed):
+                    raise
+                self.stats["retries"] += 1
+                print(f"⚠️ Batch of {len(rows)} {self.label} failed ({e.__class__.__name__}), retry {attempt}")
+                time.sleep(WRITE_RETRY_DELAY * 2 ** (attempt - 1))
+
+        self.stats["rows"] += len(rows)
+        self.stats["batches"] += 1
+        self.stats["seconds"] += time.time() - started
+        print(f"📦 Batch {self.stats['batches']}: {updated}/{len(rows)} {self.label} updated "
+              f"({self.stats['rows']} total, {self.rate():,.0f} {self.label}/s)")
+        if self.on_batch:
+            self.on_batch(self.stats["rows"])
+
+    def _apply(self, conn, rows):
+        with conn.cursor() as cursor:
+            cursor.execute(self.create_sql)
+            try:
+                updated = self._update(cursor, rows)
+            except UniqueViolation:
+                updated = sum(self._update_row(cursor, row) for row in rows)
+        conn.commit()
+        return updated
+
+    def _update(self, cursor, rows):
+        # Under a savepoint, so a failed batch leaves the rest of the transaction intact
+        cursor.execute("SAVEPOINT batch_writer")
+        try:
+            cursor.execute(self.truncate_sql)
+            execute_values(cursor, self.insert_sql, rows, page_size=len(rows))
+            cursor.execute(self.update_sql)
+            updated = cursor.rowcount
+        except UniqueViolation:
+            cursor.execute("ROLLBACK TO SAVEPOINT batch_writer")
+            raise
+        cursor.execute("RELEASE SAVEPOINT batch_writer")
+        return updated
+
+    def _update_row(self, cursor, row):
+        try:
+            return self._update(cursor, [row])
+        except UniqueViolation as e:
+            self.stats["conflicts"] += 1
+            print(f"⚠️ Skipped {self.key}={row[0]} ({self.label}): {str(e).splitlines()[0]}")
+            return 0
+
+    def rate(self):
+        """
+        Rows written per second spent writing.
+        """
+        return self.stats["rows"] / max(self.stats["seconds"], 1e-9)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+        return False
@@ -0,0 +1,147 @@
+import io
+import os
+import time
+
+import pandas as pd
+
+from db_setup import connection
+
+# CSV rows read, staged and merged per transaction
+BULK_CHUNK_ROWS = int(os.environ.get("BULK_CHUNK_ROWS", 10000))
+
+DESTINATION_COLUMNS = [
+    "name", "city", "state", "country", "type",
+    "tags", "rating", "reviews", "adventure", "relax",
+    "nature", "culture", "luxury", "description",
+    "latitude", "longitude",
+]
+STAGING_TABLE = "destinations_staging"
+# Expressions of the destinations_normalized_key unique index (ON CONFLICT target)
+NORMALIZED_KEY = ", ".join([
+    "(lower(btrim(name)))",
+    "(lower(btrim(coalesce(city, ''))))",
+    "(lower(btrim(coalesce(state, ''))))",
+    "(lower(btrim(coalesce(country, ''))))",
+])
+
+
+# -----------------------------
+# COPY text-format encoding
+# -----------------------------
+def _escape(text):
+    return (text.replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+def _array_literal(values):
+    # text[] literal; every element quoted so commas, braces and spaces survive
+    elements = ('"' + str(v).replace("\\", "\\\\").replace('"', '\\"') + '"' for v in values)
+    return "{" + ",".join(elements) + "}"
+
+def encode_value(value):
+    """
+    One field of a COPY ... FROM STDIN (text format) line.
+    """
+    if value is None or value is pd.NA:
+        return "\\N"
+    if isinstance(value, (list, tuple, set)):
+        return _escape(_array_literal(value))
+    if isinstance(value, float) or hasattr(value, "dtype"):
+        if pd.isna(value):
+            return "\\N"
+        if isinstance(value, float) and value.is_integer():
+            # 69636.0 must load into integer columns too
+            return str(int(value))
+        return str(value)
+    return _escape(str(value))
+
+def encode_rows(df, columns=DESTINATION_COLUMNS):
+    """
+    The rows of df as a COPY text-format buffer.
+    """
+    buffer = io.StringIO()
+    for row in df[columns].itertuples(index=False, name=None):
+        buffer.write("\t".join(encode_value(v) for v in row))
+        buffer.write("\n")
+    buffer.seek(0)
+    return buffer
+
+
+# -----------------------------
+# Staging + merge
+# -----------------------------
+def merge_sql(columns=DESTINATION_COLUMNS):
+    """
+    Set-based INSERT ... SELECT from the staging table into destinations, in
+    CSV order. Rows whose normalized key already exists (or appeared earlier
+    in the chunk) are skipped by the destinations_normalized_key unique index
+    (DB/migrations/001_destinations_normalized_key.sql).
+    """
+    column_list = ", ".join(columns)
+    return f"""
+        INSERT INTO destinations ({column_list})
+        SELECT {column_list} FROM {STAGING_TABLE}
+        ORDER BY position
+        ON CONFLICT ({NORMALIZED_KEY}) DO NOTHING
+    """
+
+def create_staging_table(cursor, columns=DESTINATION_COLUMNS):
+    # Same column types as destinations, private to this session; position keeps the CSV order
+    cursor.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+    cursor.execute(f"CREATE TEMP TABLE {STAGING_TABLE} AS SELECT {', '.join(columns)} FROM destinations WITH NO DATA")
+    cursor.execute(f"ALTER TABLE {STAGING_TABLE} ADD COLUMN position BIGSERIAL")
+
+def read_chunks(csv_file, prepare, chunk_size=None, **read_csv_kwargs):
+    """
+    Streams csv_file in chunks of chunk_size rows through prepare(chunk),
+    which returns a DataFrame with the destination columns.
+    """
+    for chunk in pd.read_csv(csv_file, chunksize=chunk_size or BULK_CHUNK_ROWS, **read_csv_kwargs):
+        prepared = prepare(chunk)
+        for column in DESTINATION_COLUMNS:
+            if column not in prepared:
+                prepared[column] = None
+        yield prepared
+
+def bulk_load(chunks, label="rows"):
+    """
+    Loads prepared DataFrame chunks into destinations: each chunk is sent
+    with COPY FROM STDIN into a temporary staging table, merged with one
+    INSERT ... ON CONFLICT DO NOTHING and committed on its own. A failing
+    chunk is rolled back and reported without stopping the load.
+    Returns:
+        dict with rows, inserted and skipped (already present) counts, and
+        failed_chunks (chunk numbers)
+    """
+    stats = {"rows": 0, "inserted": 0, "skipped": 0, "failed_chunks": []}
+    started = time.time()
+    merge = merge_sql()
+    copy = f"COPY {STAGING_TABLE} ({', '.join(DESTINATION_COLUMNS)}) FROM STDIN"
+
+    with connection(statement_timeout=0) as conn:
+        cursor = conn.cursor()
+        create_staging_table(cursor)
+        conn.commit()
+
+        for number, chunk in enumerate(chunks, start=1):
+            try:
+                cursor.execute(f"TRUNCATE {STAGING_TABLE}")
+                cursor.copy_expert(copy, encode_rows(chunk))
+                cursor.execute(merge)
+                inserted = max(cursor.rowcount, 0)
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                stats["failed_chunks"].append(number)
+                print(f"❌ Chunk {number} ({len(chunk)} {label}) failed: {e}")
+                continue
+
+            stats["rows"] += len(chunk)
+            stats["inserted"] += inserted
+            stats["skipped"] += len(chunk) - inserted
+            rate = stats["rows"] / max(time.time() - started, 1e-9)
+            print(f"📦 Chunk {number}: {stats['rows']} {label} staged, "
+                  f"{stats['inserted']} inserted, {stats['skipped']} skipped ({rate:,.0f} {label}/s)")
+
+        cursor.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+        cursor.close()
+    return stats
@@ -0,0 +1,208 @@
+"""
+Harness asserting that enrich scripts leave the destinations table in
+the same state before and after a refactor.
+
+Each script runs twice against the same fixture database: once as it was
+at --before (a git revision, default HEAD) and once from the working tree.
+The fixture is a TEMP destinations table, which shadows the real one for
+this session only. Its rows come from the scraped datasets, plus rows
+named after Holidify cities and destinations.csv entries so every pass
+has something to update. After each run the table is snapshotted and
+rolled back, and the two snapshots must match row for row. Rows a run
+inserted are compared without their (sequence-assigned) ids.
+
+    python DB/check_enrichment_updates.py
+    python DB/check_enrichment_updates.py --before HEAD~1 enrich_all_sources.py
+"""
+import argparse
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+from collections import Counter
+
+import pandas as pd
+
+DB_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(DB_DIR)
+DEFAULT_SCRIPTS = ["enrich_all_sources.py", "enrich_with_description.py"]
+# Modules of DB/ the scripts import; reloaded from each version's tree
+LOCAL_MODULES = ["db_setup", "enrichment", "matching", "bulk_load", "batch_writer"]
+PLACES = [
+    ("cleaned_data_India.csv", "India"),
+    ("cleaned_data_USA.csv", "USA"),
+    ("cleaned_data_Iran.csv", "Iran"),
+]
+
+
+# -----------------------------
+# Fixture
+# -----------------------------
+def fixture_rows(datasets_dir):
+    rows = []
+    for file_name, country in PLACES:
+        df = pd.read_csv(os.path.join(datasets_dir, file_name)).dropna(subset=["name"])
+        for name, city, state, categories in df[["name", "city", "state", "categories"]].itertuples(index=False, name=None):
+            tags = [t.strip() for t in str(categories).split(",") if t.strip()] if isinstance(categories, str) else []
+            # Half the places get a description for enrich_all_from_db.py to re-tag
+            description = f"{name} in {city}: {categories}" if len(rows) % 2 else None
+            rows.append((name.strip(), _text(city), _text(state), country, tags, description))
+    # Holidify cities, some twice (different city field) so one row updates several ids
+    holidify = pd.read_csv(os.path.join(datasets_dir, "holidify.csv"))
+    for i, city in enumerate(holidify["City"].str.strip()):
+        rows.append((city, None, None, "India", ["existing"], None))
+        if i % 3 == 0:
+            rows.append((city, city, None, "India", [], None))
+    # Every other destinations.csv entry already exists (UPDATE), the rest is INSERTed
+    destinations = pd.read_csv(os.path.join(datasets_dir, "destinations.csv"), encoding="ISO-8859-1")
+    for name, country in destinations[["Destination", "Country"]].iloc[::2].itertuples(index=False, name=None):
+        rows.append((name.strip(), None, None, country.strip(), [], None))
+    return rows
+
+def _text(value):
+    return value.strip() if isinstance(value, str) else None
+
+def fixture_datasets(datasets_dir, target):
+    """
+    A datasets/ directory for the scripts: links to the real CSVs, plus
+    iran_tourist_pois_cleaned.csv derived from cleaned_data_Iran.csv when
+    the checkout does not have it.
+    """
+    os.makedirs(target)
+    for file_name in os.listdir(datasets_dir):
+        os.symlink(os.path.join(datasets_dir, file_name), os.path.join(target, file_name))
+    if not os.path.exists(os.path.join(target, "iran_tourist_pois_cleaned.csv")):
+        iran = pd.read_csv(os.path.join(datasets_dir, "cleaned_data_Iran.csv"))
+        pd.DataFrame({
+            "name": iran["name"],
+            "city": iran["city"],
+            # enrich_all_sources.py lowercases all three, so none may be empty
+            "tourism": iran["main_category"].fillna("attraction"),
+            "amenity": iran["broader_category"].fillna("place"),
+            "man_made": "no",
+        }).to_csv(os.path.join(target, "iran_tourist_pois_cleaned.csv"), index=False)
+
+def create_fixture_table(cursor, rows):
+    cursor.execute("CREATE TEMP TABLE destinations (LIKE public.destinations INCLUDING DEFAULTS)")
+    for row in rows:
+        cursor.execute(
+            "INSERT INTO destinations (name, city, state, country, tags, description) VALUES (%s, %s, %s, %s, %s, %s)",
+            row,
+        )
+
+
+# -----------------------------
+# Fixture connection
+# -----------------------------
+class FixtureConnection:
+    """
+    The fixture connection as the scripts see it: commits are ignored, so
+    the harness can roll every run back.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def commit(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+SNAPSHOT_COLUMNS = ["id", "name", "city", "state", "country", "description", "tags",
+                    "adventure", "relax", "nature", "culture", "luxury"]
+
+def snapshot(cursor, fixture_ids):
+    cursor.execute(f"SELECT {', '.join(SNAPSHOT_COLUMNS)} FROM destinations")
+    return Counter(
+        (row[0] if row[0] in fixture_ids else None,) + tuple(tuple(v) if isinstance(v, list) else v for v in row[1:])
+        for row in cursor.fetchall()
+    )
+
+
+# -----------------------------
+# Runs
+# -----------------------------
+def checkout(revision, target):
+    """
+    Extracts DB/ of a git revision into target.
+    """
+    archive = subprocess.run(["git", "archive", revision, "DB"], cwd=REPO_DIR,
+                             check=True, capture_output=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(target, filter="data")
+    return os.path.join(target, "DB")
+
+def run_script(script_dir, script, conn, workdir):
+    """
+    Executes one enrich script with conn as its database connection.
+    """
+    for module in LOCAL_MODULES:
+        sys.modules.pop(module, None)
+    sys.path.insert(0, script_dir)
+    fixture = FixtureConnection(conn)
+    cwd = os.getcwd()
+    try:
+        import db_setup
+        db_setup.get_connection = lambda: fixture
+        db_setup.connection = contextlib.contextmanager(lambda statement_timeout=None: (yield fixture))
+        db_setup.close_connection = lambda c, cursor=None: cursor.close() if cursor else None
+        with open(os.path.join(script_dir, script)) as f:
+            code = compile(f.read(), script, "exec")
+        os.chdir(workdir)
+        with contextlib.redirect_stdout(io.StringIO()):
+            exec(code, {"__name__": "__main__", "__file__": script})
+    finally:
+        os.chdir(cwd)
+        sys.path.remove(script_dir)
+
+def compare(script, before, after):
+    missing = before - after
+    extra = after - before
+    print(f"{script}: {sum(before.values())} rows before, {sum(after.values())} after, "
+          f"{sum(missing.values())} differ")
+    for row in list(missing)[:5]:
+        print(f"   ❌ only before: {str(row)[:140]}")
+    for row in list(extra)[:5]:
+        print(f"   ❌ only after: {str(row)[:140]}")
+    return not missing and not extra
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Assert identical enrichment results before and after a change")
+    parser.add_argument("scripts", nargs="*", default=DEFAULT_SCRIPTS)
+    parser.add_argument("--before", default="HEAD", help="git revision of the reference scripts")
+    args = parser.parse_args()
+
+    sys.path.insert(0, DB_DIR)
+    from db_setup import connection
+
+    with tempfile.TemporaryDirectory() as tmp, connection() as conn:
+        before_dir = checkout(args.before, os.path.join(tmp, "before"))
+        workdir = os.path.join(tmp, "work")
+        fixture_datasets(os.path.join(REPO_DIR, "datasets"), os.path.join(workdir, "datasets"))
+
+        cursor = conn.cursor()
+        rows = fixture_rows(os.path.join(REPO_DIR, "datasets"))
+        create_fixture_table(cursor, rows)
+        cursor.execute("SELECT id FROM destinations")
+        fixture_ids = {row[0] for row in cursor.fetchall()}
+        print(f"🧪 Fixture: {len(rows)} destinations, reference {args.before}")
+
+        identical = True
+        for script in args.scripts:
+            runs = []
+            for script_dir in (before_dir, DB_DIR):
+                cursor.execute("SAVEPOINT enrichment_run")
+                run_script(script_dir, script, conn, workdir)
+                runs.append(snapshot(cursor, fixture_ids))
+                cursor.execute("ROLLBACK TO SAVEPOINT enrichment_run")
+            identical &= compare(script, *runs)
+        conn.rollback()
+
+    if not identical:
+        raise SystemExit("❌ Results differ")
+    print("✅ Identical destinations after every script")
@@ -0,0 +1,111 @@
+"""
+Determinism check for DestinationMatcher against the original
+match_destination loop (fuzzywuzzy token_sort_ratio > 90, first key wins).
+
+The db_lookup fixture is built from the scraped datasets the way the
+enrich scripts build it from the destinations table. Queries are rows of
+those files, exact and with typos / reordered tokens, so both the exact
+and the fuzzy paths are exercised.
+
+    python DB/check_matching.py --queries 500
+"""
+import argparse
+import random
+import time
+
+import pandas as pd
+from fuzzywuzzy import fuzz
+
+from matching import DestinationMatcher
+
+SOURCES = [
+    ("datasets/cleaned_data_India.csv", "India"),
+    ("datasets/cleaned_data_USA.csv", "USA"),
+    ("datasets/cleaned_data_Iran.csv", "Iran"),
+]
+
+
+def match_destination(name, city, state, db_lookup, country):
+    # The original implementation, kept verbatim as the reference
+    key = (name.strip().lower(), str(city).strip().lower(), str(state).strip().lower(), country.lower())
+    if key in db_lookup:
+        return db_lookup[key]["id"]
+    for k in db_lookup:
+        if k[3] == country.lower():
+            score = fuzz.token_sort_ratio(" ".join(key[:3]), " ".join(k[:3]))
+            if score > 90:
+                return db_lookup[k]["id"]
+    return None
+
+def load_fixture():
+    db_lookup, places = {}, []
+    for csv_file, country in SOURCES:
+        df = pd.read_csv(csv_file).dropna(subset=["name"])
+        for name, city, state in df[["name", "city", "state"]].itertuples(index=False, name=None):
+            key = (name.strip().lower(), str(city).strip().lower(), str(state).strip().lower(), country.lower())
+            db_lookup.setdefault(key, {"id": len(db_lookup) + 1})
+            places.append((name, city, state, country))
+    return db_lookup, places
+
+def perturb(text, rng):
+    text = str(text)
+    choice = rng.random()
+    if choice < 0.3 and len(text) > 3:
+        i = rng.randrange(len(text))
+        return text[:i] + text[i + 1:]
+    if choice < 0.5:
+        return " ".join(reversed(text.split()))
+    if choice < 0.7 and len(text) > 3:
+        i = rng.randrange(len(text) - 1)
+        return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+    if choice < 0.85:
+        return text.upper() + "!"
+    return text + " " + rng.choice(["Park", "Museum", "Center", "x"])
+
+def make_queries(places, n, seed):
+    rng = random.Random(seed)
+    queries = []
+    for name, city, state, country in rng.sample(places, min(n, len(places))):
+        if rng.random() < 0.8:
+            name = perturb(name, rng)
+        if country == "Iran" and rng.random() < 0.5:
+            state = ""
+        queries.append((name, city, state, country))
+    return queries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare DestinationMatcher with the original match_destination")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    db_lookup, places = load_fixture()
+    queries = make_queries(places, args.queries, args.seed)
+    print(f"🔎 {len(db_lookup)} lookup keys, {len(queries)} queries")
+
+    started = time.perf_counter()
+    expected = [match_destination(name, city, state, db_lookup, country) for name, city, state, country in queries]
+    reference_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    matcher = DestinationMatcher(db_lookup)
+    build_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    actual = [None] * len(queries)
+    for country in sorted({q[3] for q in queries}):
+        positions = [i for i, q in enumerate(queries) if q[3] == country]
+        ids = matcher.match_many([queries[i][:3] for i in positions], country)
+        for i, found in zip(positions, ids):
+            actual[i] = found
+    match_seconds = time.perf_counter() - started
+
+    mismatches = [(q, e, a) for q, e, a in zip(queries, expected, actual) if e != a]
+    matched = sum(e is not None for e in expected)
+    print(f"⏱️ original: {reference_seconds:.2f}s, matcher: {build_seconds:.2f}s build + {match_seconds:.3f}s match "
+          f"({matched} matched, {len(queries) - matched} unmatched)")
+    for query, e, a in mismatches[:20]:
+        print(f"❌ {query}: expected {e}, got {a}")
+    if mismatches:
+        raise SystemExit(f"❌ {len(mismatches)} of {len(queries)} results differ")
+    print("✅ Identical results")
@@ -1,30 +1,161 @@
-import psycopg2
+import atexit
 import os
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import pool
+
+# Pool sizing: connections opened up front, and the most ever open at once
+DB_POOL_MIN = int(os.environ.get("DB_POOL_MIN", 1))
+DB_POOL_MAX = int(os.environ.get("DB_POOL_MAX", 10))
+# Seconds to wait for a free connection before giving up
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 30))
+# Default statement timeout of every session in milliseconds (0 = none)
+DB_STATEMENT_TIMEOUT_MS = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", 30000))
+DB_CONNECT_TIMEOUT = int(os.environ.get("DB_CONNECT_TIMEOUT", 10))
+# Connections idle for longer than this are pinged before being handed out
+DB_HEALTHCHECK_IDLE = float(os.environ.get("DB_HEALTHCHECK_IDLE", 30))
+
+_pool = None
+_pool_pid = None
+_slots = None
+_last_used = {}
+_lock = threading.Lock()
+
+
+def _connect_kwargs():
+    kwargs = dict(
+        dbname=os.environ.get("DB_NAME"),
+        user=os.environ.get("DB_USER"),
+        password=os.environ.get("DB_PASS"),
+        host=os.environ.get("DB_HOST"),
+        port=os.environ.get("DB_PORT", "5432"),
+        connect_timeout=DB_CONNECT_TIMEOUT,
+    )
+    if DB_STATEMENT_TIMEOUT_MS:
+        kwargs["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+    return kwargs
+
+def get_pool():
+    """
+    Returns this process's connection pool, creating it on first use.
+    A process forked from one that already had a pool (e.g. a gunicorn
+    worker) gets its own: the inherited sockets belong to the parent.
+    """
+    global _pool, _pool_pid, _slots
+    with _lock:
+        if _pool is None or _pool_pid != os.getpid():
+            try:
+                _pool = pool.ThreadedConnectionPool(DB_POOL_MIN, DB_POOL_MAX, **_connect_kwargs())
+            except psycopg2.Error as e:
+                print("❌ Unable to connect to the database.")
+                print(e)
+                raise
+            _pool_pid = os.getpid()
+            _slots = threading.BoundedSemaphore(DB_POOL_MAX)
+            _last_used.clear()
+            print(f"✅ Connected to PostgreSQL! (pool {DB_POOL_MIN}-{DB_POOL_MAX})")
+        return _pool
+
+def _healthy(conn):
+    if conn.closed:
+        return False
+    if time.monotonic() - _last_used.get(id(conn), 0) < DB_HEALTHCHECK_IDLE:
+        return True
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        conn.rollback()
+        return True
+    except psycopg2.Error:
+        return False
 
 def get_connection():
     """
-    Establishes a connection to the PostgreSQL database.
+    Checks a connection out of the pool. Hand it back with
+    close_connection() (or use connection(), which does both).
     Returns:
         conn: psycopg2 connection object
+    Raises:
+        psycopg2.Error if the database is unreachable,
+        pool.PoolError if no connection frees up within DB_POOL_TIMEOUT
     """
+    connections = get_pool()
+    if not _slots.acquire(timeout=DB_POOL_TIMEOUT):
+        raise pool.PoolError(f"No database connection available within {DB_POOL_TIMEOUT}s")
     try:
-        conn = psycopg2.connect(
-            dbname=os.environ.get("DB_NAME"),
-            user=os.environ.get("DB_USER"),
-            password=os.environ.get("DB_PASS"),
-            host=os.environ.get("DB_HOST"),
-            port=os.environ.get("DB_PORT", "5432")
-        )
-        print("✅ Connected to PostgreSQL!")
-        return conn
-    except psycopg2.Error as e:
-        print("❌ Unable to connect to the database.")
-        print(e)
-        return None
-    
+        conn = connections.getconn()
+        if not _healthy(conn):
+            # Stale or dropped by the server: replace it with a fresh one
+            connections.putconn(conn, close=True)
+            conn = connections.getconn()
+    except Exception:
+        _slots.release()
+        raise
+    return conn
+
+def release_connection(conn, broken=False):
+    """
+    Returns a connection to the pool, closing it if it is broken.
+    """
+    if _pool is None or _pool_pid != os.getpid():
+        conn.close()
+        return
+    _last_used[id(conn)] = time.monotonic()
+    try:
+        _pool.putconn(conn, close=broken or bool(conn.closed))
+    finally:
+        _slots.release()
+
+@contextmanager
+def connection(statement_timeout=None):
+    """
+    Pooled connection for a with block: commits when the block succeeds,
+    rolls back when it raises, and always returns the connection.
+    Args:
+        statement_timeout: milliseconds for this checkout instead of
+            DB_STATEMENT_TIMEOUT_MS (0 = no limit), e.g. for bulk loads
+            that commit several transactions
+    """
+    conn = get_connection()
+    broken = False
+    try:
+        if statement_timeout is not None:
+            with conn.cursor() as cursor:
+                cursor.execute("SET statement_timeout = %s", (int(statement_timeout),))
+            # Committed on its own so a rollback in the block cannot undo it
+            conn.commit()
+        yield conn
+        conn.commit()
+    except Exception as e:
+        broken = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+        if not conn.closed:
+            conn.rollback()
+        raise
+    finally:
+        if statement_timeout is not None and not broken and not conn.closed:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("RESET statement_timeout")
+                conn.commit()
+            except psycopg2.Error:
+                broken = True
+        release_connection(conn, broken)
+
 def close_connection(conn, cursor=None):
     if cursor:
         cursor.close()
     if conn:
-        conn.close()
-        print("🔌 PostgreSQL connection closed.")
+        release_connection(conn)
+        print("🔌 PostgreSQL connection returned to the pool.")
+
+def close_pool():
+    global _pool
+    with _lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.closeall()
+        _pool = None
+
+atexit.register(close_pool)
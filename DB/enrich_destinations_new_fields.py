@@ -1,8 +1,7 @@
 import pandas as pd
-import psycopg2
-import re
-from fuzzywuzzy import fuzz
 from db_setup import get_connection, close_connection
+from batch_writer import BatchWriter
+from enrichment import TRAITS, extract_traits_and_tags
 
 # Load destinations.csv
 destinations_df = pd.read_csv("datasets/destinations.csv", encoding="ISO-8859-1")
@@ -20,42 +19,6 @@ destinations_df.rename(columns={
 luxury_map = {"Low": 1, "Medium": 3, "Medium-high": 4, "High": 5}
 destinations_df["luxury_score"] = destinations_df["cost"].map(lambda x: luxury_map.get(str(x).strip().title(), None) if pd.notna(x) else None)
 
-# Define traits and tag keywords
-trait_keywords = {
-    "adventure": ["hike", "trek", "adventure", "zipline", "kayak", "climb", "safari", "rafting", "outdoor"],
-    "relax": ["relax", "spa", "quiet", "peaceful", "calm", "serene", "retreat"],
-    "nature": ["park", "mountain", "forest", "valley", "lake", "trail", "wildlife", "waterfall"],
-    "culture": ["museum", "historic", "heritage", "culture", "tradition", "site"],
-    "luxury": ["luxury", "fine dining", "resort", "exclusive", "high-end", "5-star"]
-}
-
-tag_keywords = {
-    "beach": ["beach", "coast", "island", "seaside", "shore", "waves", "bay", "lagoon"],
-    "mountain": ["mountain", "hill", "peak", "range", "ridge", "summit"],
-    "desert": ["desert", "dune", "sands", "arid", "oasis"],
-    "spiritual": ["temple", "ashram", "pilgrimage", "spiritual", "monastery", "holy", "divine"],
-    "wildlife": ["safari", "national park", "jungle", "wildlife", "zoo", "reserve", "nature trail", "animal"],
-    "historic": ["fort", "ruins", "monument", "castle", "citadel", "tomb"],
-    "urban": ["shopping", "nightlife", "skyline", "market", "restaurant", "bar", "café", "street food", "bustling"]
-}
-
-def extract_traits_and_tags(text):
-    text = str(text).lower() if pd.notna(text) else ""
-    traits = {key: 0 for key in trait_keywords}
-    tags = set()
-
-    for trait, words in trait_keywords.items():
-        for word in words:
-            if re.search(rf"\b{re.escape(word)}\b", text):
-                traits[trait] += 1
-
-    for tag, words in tag_keywords.items():
-        for word in words:
-            if re.search(rf"\b{re.escape(word)}\b", text):
-                tags.add(tag)
-
-    return list(tags), traits
-
 # Connect to DB
 conn = get_connection()
 cursor = conn.cursor()
@@ -69,6 +32,7 @@ db_lookup = {
 }
 
 updated = 0
+writer = BatchWriter(["description", "tags", "state"] + TRAITS, label="destinations")
 
 # Process enrichment
 for _, row in destinations_df.iterrows():
@@ -87,30 +51,10 @@ for _, row in destinations_df.iterrows():
 
     key = (name, country)
     if key in db_lookup:
-        cursor.execute("""
-            UPDATE destinations SET
-                description = %s,
-                tags = %s,
-                state = COALESCE(%s, state),
-                adventure = %s,
-                relax = %s,
-                nature = %s,
-                culture = %s,
-                luxury = %s
-            WHERE id = %s
-        """, (
-            desc,
-            new_tags,
-            state,
-            traits["adventure"],
-            traits["relax"],
-            traits["nature"],
-            traits["culture"],
-            traits["luxury"],
-            db_lookup[key]
-        ))
+        writer.add(db_lookup[key], [desc, new_tags, state] + [traits[t] for t in TRAITS])
         updated += 1
 
+writer.flush()
 conn.commit()
 close_connection(conn, cursor)
 print(f"✅ Enrichment complete (without category in tags): {updated} destinations updated from destinations.csv")
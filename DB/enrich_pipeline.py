@@ -0,0 +1,437 @@
+"""
+Incremental enrichment of the destinations table from all sources.
+
+Rows stream through generator stages:
+
+    load -> normalize -> match -> extract -> diff -> write
+
+- load: reads each source CSV in chunks (usa, iran, holidify, destinations)
+- normalize: turns a source row into a record (keys, text, fixed tags)
+- match: resolves the destination ids of a record (fuzzy for usa/iran,
+  by name for holidify/destinations), or marks it for insertion
+- extract: traits, tags and the content hash of the values to write, in a
+  process pool
+- diff: later sources overwrite earlier ones (like the old scripts' pass
+  order); rows whose content hash equals destinations.enrichment_hash are
+  skipped, so reruns only touch new or changed rows
+- write: BatchWriter commits every WRITE_BATCH_ROWS rows and the progress is
+  recorded in a checkpoint; an interrupted run resumes where it stopped
+
+    python DB/migrate.py                  # once: adds destinations.enrichment_hash
+    python DB/enrich_pipeline.py --dry-run --report /tmp/enrich-diff.jsonl
+    python DB/enrich_pipeline.py
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import pickle
+import tempfile
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from psycopg2.extras import execute_values
+
+from batch_writer import BatchWriter
+from bulk_load import NORMALIZED_KEY
+from db_setup import connection
+from enrichment import TRAITS, extract_traits_and_tags
+from matching import COUNTRY, MATCH_BATCH_SIZE, NAME, DestinationMatcher, index_keys
+
+# Processes for the extract stage (1 = run it in this process)
+ENRICH_WORKERS = int(os.environ.get("ENRICH_WORKERS", os.cpu_count() or 1))
+# Records per extract task, and CSV rows read at a time
+ENRICH_CHUNK_ROWS = int(os.environ.get("ENRICH_CHUNK_ROWS", 500))
+ENRICH_CHECKPOINT_DIR = os.environ.get(
+    "ENRICH_CHECKPOINT_DIR", os.path.join(tempfile.gettempdir(), "enrich_checkpoint")
+)
+
+# Pass order: a destination matched by several sources keeps the last one's values
+SOURCE_FILES = {
+    "usa": "datasets/cleaned_data_USA_with_descriptions.csv",
+    "iran": "datasets/iran_tourist_pois_cleaned.csv",
+    "holidify": "datasets/holidify.csv",
+    "destinations": "datasets/destinations.csv",
+}
+SOURCE_ENCODINGS = {"destinations": "ISO-8859-1"}
+ENRICHED_COLUMNS = ["description", "tags"] + TRAITS
+LUXURY_MAP = {"Low": 1, "Medium": 3, "Medium-high": 4, "High": 5}
+
+
+# -----------------------------
+# Load + normalize
+# -----------------------------
+def load_sources(sources):
+    """
+    Yields (source, position, row dict) for every row of every source file.
+    """
+    for source in sources:
+        path = SOURCE_FILES[source]
+        if not os.path.exists(path):
+            print(f"⚠️ File not found: {path}")
+            continue
+        position = 0
+        for chunk in pd.read_csv(path, chunksize=ENRICH_CHUNK_ROWS, encoding=SOURCE_ENCODINGS.get(source)):
+            for row in chunk.to_dict("records"):
+                yield source, position, row
+                position += 1
+
+def _text(value):
+    return value.strip() if isinstance(value, str) else ""
+
+def clean_tags(values):
+    # Lower-cased, stripped, de-duplicated in first-seen order
+    tags = (v.strip().lower() for v in values if isinstance(v, str))
+    return list(dict.fromkeys(t for t in tags if t and t != "nan"))
+
+def _usa(row):
+    categories = _text(row.get("categories")).split(",") + [_text(row.get("main_category"))]
+    return dict(name=_text(row["name"]), city=_text(row.get("city")), state=_text(row.get("state")),
+                country="usa", match="fuzzy", description=row.get("description"),
+                text=row.get("description"), tags=clean_tags(categories))
+
+def _iran(row):
+    name = _text(row["name"])
+    tags = clean_tags([row.get(field) for field in ("tourism", "amenity", "man_made")])
+    return dict(name=name, city=_text(row.get("city")), state="", country="iran", match="fuzzy",
+                description=f"{name} is a place of interest in Iran known for its tourism and cultural value.",
+                text=" ".join(tags), tags=tags)
+
+def _holidify(row):
+    description = row.get("About the city (long Description)")
+    return dict(name=_text(row["City"]).lower(), country="india", match="all",
+                description=description, text=description, merge_tags=True)
+
+def _destinations(row):
+    cost = row.get("Cost of Living")
+    return dict(name=_text(row["Destination"]).lower(), country=_text(row.get("Country")).lower(),
+                match="first_or_insert", description=row.get("Description"), text=row.get("Description"),
+                luxury=LUXURY_MAP.get(str(cost).strip().title()) if pd.notna(cost) else None)
+
+NORMALIZERS = {"usa": _usa, "iran": _iran, "holidify": _holidify, "destinations": _destinations}
+
+def normalize(rows):
+    for source, position, row in rows:
+        record = NORMALIZERS[source](row)
+        if not record["name"]:
+            continue
+        if not isinstance(record["description"], str):
+            record["description"] = None
+        record.update(source=source, position=position)
+        yield record
+
+
+# -----------------------------
+# Match
+# -----------------------------
+def match(records, db_lookup, stats):
+    """
+    Yields one record per destination it updates (with "id" and, for
+    holidify, that row's current tags), or one with id None to insert.
+    """
+    matcher = DestinationMatcher(db_lookup)
+    by_name_country = index_keys(db_lookup, NAME, COUNTRY)
+    while True:
+        batch = list(itertools.islice(records, MATCH_BATCH_SIZE))
+        if not batch:
+            return
+        fuzzy_ids = {}
+        for country in {r["country"] for r in batch if r["match"] == "fuzzy"}:
+            positions = [i for i, r in enumerate(batch) if r["match"] == "fuzzy" and r["country"] == country]
+            found = matcher.match_many([(batch[i]["name"], batch[i]["city"], batch[i]["state"]) for i in positions],
+                                       country)
+            fuzzy_ids.update(zip(positions, found))
+
+        for i, record in enumerate(batch):
+            if record["match"] == "fuzzy":
+                keys = [fuzzy_ids[i]] if fuzzy_ids[i] else []
+                targets = [(key, None) for key in keys]
+            else:
+                keys = by_name_country.get((record["name"], record["country"]), [])
+                if record["match"] == "first_or_insert":
+                    keys = keys[:1]
+                targets = [(db_lookup[k]["id"], db_lookup[k]["tags"]) for k in keys]
+
+            if targets:
+                stats[record["source"], "matched"] += 1
+                for dest_id, existing_tags in targets:
+                    yield dict(record, id=dest_id, existing_tags=existing_tags)
+            elif record["match"] == "first_or_insert":
+                stats[record["source"], "new"] += 1
+                yield dict(record, id=None, existing_tags=None)
+            else:
+                stats[record["source"], "unmatched"] += 1
+
+
+# -----------------------------
+# Extract (process pool)
+# -----------------------------
+def content_hash(values):
+    payload = json.dumps([values[c] for c in ENRICHED_COLUMNS], ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def extract_chunk(records):
+    """
+    Adds the values to write ("values") and their content hash to each record.
+    """
+    for record in records:
+        existing = record["existing_tags"] if record.get("merge_tags") else None
+        tags, traits = extract_traits_and_tags(record["text"], existing)
+        if record.get("tags") is not None:
+            tags = record["tags"]
+        if record.get("luxury"):
+            traits["luxury"] = record["luxury"]
+        values = dict(description=record["description"], tags=tags, **traits)
+        record["values"] = values
+        record["hash"] = content_hash(values)
+    return records
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+def extract(records, executor=None):
+    """
+    Runs extract_chunk over chunks of records, in order, with at most two
+    chunks per worker in flight so the stream stays bounded.
+    """
+    if executor is None:
+        for chunk in _chunks(records, ENRICH_CHUNK_ROWS):
+            yield from extract_chunk(chunk)
+        return
+    pending = deque()
+    for chunk in _chunks(records, ENRICH_CHUNK_ROWS):
+        pending.append(executor.submit(extract_chunk, chunk))
+        if len(pending) >= 2 * ENRICH_WORKERS:
+            yield from pending.popleft().result()
+    while pending:
+        yield from pending.popleft().result()
+
+
+# -----------------------------
+# Diff
+# -----------------------------
+def diff(records, stored_hashes, stats, full=False):
+    """
+    Resolves the last record per destination and returns the changes to
+    write: updates whose content hash differs from the stored one (all of
+    them when full), then inserts.
+    """
+    final, inserts = {}, []
+    for record in records:
+        if record["id"] is None:
+            inserts.append(record)
+        else:
+            final[record["id"]] = record
+    changes = []
+    for dest_id, record in final.items():
+        if not full and stored_hashes.get(dest_id) == record["hash"]:
+            stats[record["source"], "unchanged"] += 1
+            continue
+        stats[record["source"], "changed"] += 1
+        changes.append(_change(record))
+    changes.extend(_change(record) for record in inserts)
+    return changes
+
+def _change(record):
+    change = {key: record[key] for key in ("id", "source", "position", "values", "hash")}
+    if record["id"] is None:
+        change["name"], change["country"] = record["name"].title(), record["country"].title()
+    return change
+
+
+# -----------------------------
+# Write + checkpoints
+# -----------------------------
+INSERT_SQL = f"""
+    INSERT INTO destinations (name, country, {", ".join(ENRICHED_COLUMNS)}, enrichment_hash)
+    VALUES %s
+    ON CONFLICT ({NORMALIZED_KEY}) DO NOTHING
+"""
+
+def fingerprint(sources, full):
+    """
+    Identifies the inputs of a plan: the source files (size, mtime) and options.
+    """
+    files = [(s, os.path.getsize(p), os.path.getmtime(p)) for s, p in SOURCE_FILES.items()
+             if s in sources and os.path.exists(p)]
+    return hashlib.sha1(json.dumps([files, full]).encode()).hexdigest()
+
+def load_checkpoint(fp):
+    """
+    Returns (changes, rows already written) of an interrupted run with the
+    same fingerprint, or None.
+    """
+    try:
+        with open(os.path.join(ENRICH_CHECKPOINT_DIR, "plan.pkl"), "rb") as f:
+            plan = pickle.load(f)
+        with open(os.path.join(ENRICH_CHECKPOINT_DIR, "progress.json")) as f:
+            written = json.load(f)["written"]
+    except (OSError, ValueError, KeyError, pickle.UnpicklingError):
+        return None
+    if plan["fingerprint"] != fp:
+        return None
+    return plan["changes"], written
+
+def save_plan(fp, changes):
+    os.makedirs(ENRICH_CHECKPOINT_DIR, exist_ok=True)
+    with open(os.path.join(ENRICH_CHECKPOINT_DIR, "plan.pkl"), "wb") as f:
+        pickle.dump({"fingerprint": fp, "changes": changes}, f)
+    save_progress(0)
+
+def save_progress(written):
+    path = os.path.join(ENRICH_CHECKPOINT_DIR, "progress.json")
+    with open(path + ".tmp", "w") as f:
+        json.dump({"written": written}, f)
+    os.replace(path + ".tmp", path)
+
+def clear_checkpoint():
+    for name in ("plan.pkl", "progress.json"):
+        try:
+            os.remove(os.path.join(ENRICH_CHECKPOINT_DIR, name))
+        except FileNotFoundError:
+            pass
+
+def write(changes, start=0):
+    """
+    Applies changes[start:]: the updates through BatchWriter (one
+    transaction and checkpoint per batch), then all inserts in one statement.
+    Returns:
+        (rows updated, rows inserted)
+    """
+    # diff() puts every update before the inserts
+    pending = changes[start:]
+    updates = [c for c in pending if c["id"] is not None]
+    inserts = [c for c in pending if c["id"] is None]
+    with BatchWriter(ENRICHED_COLUMNS + ["enrichment_hash"], on_batch=lambda n: save_progress(start + n)) as writer:
+        for change in updates:
+            writer.add(change["id"], [change["values"][c] for c in ENRICHED_COLUMNS] + [change["hash"]])
+
+    inserted = 0
+    if inserts:
+        rows = [[c["name"], c["country"]] + [c["values"][col] for col in ENRICHED_COLUMNS] + [c["hash"]]
+                for c in inserts]
+        with connection() as conn:
+            cursor = conn.cursor()
+            execute_values(cursor, INSERT_SQL, rows, page_size=len(rows))
+            inserted = max(cursor.rowcount, 0)
+            cursor.close()
+        save_progress(len(changes))
+    return len(updates), inserted
+
+
+# -----------------------------
+# Dry-run report
+# -----------------------------
+def report(changes, stats, limit=20, path=None):
+    """
+    Prints per-source counts and the field-level diff of the first limit
+    changes; writes every change as a JSON line to path when given.
+    """
+    for source in dict.fromkeys(s for s, _ in stats):
+        counts = ", ".join(f"{stats[source, k]} {k}" for k in ("matched", "unmatched", "new", "changed", "unchanged")
+                           if stats[source, k])
+        print(f"📋 {source}: {counts}")
+    print(f"📋 {len(changes)} rows would be written")
+
+    ids = [c["id"] for c in changes if c["id"] is not None]
+    old = {}
+    if ids:
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT id, name, {', '.join(ENRICHED_COLUMNS)} FROM destinations WHERE id = ANY(%s)",
+                           (ids,))
+            old = {row[0]: dict(zip(["name"] + ENRICHED_COLUMNS, row[1:])) for row in cursor.fetchall()}
+            cursor.close()
+
+    out = open(path, "w") if path else None
+    try:
+        for n, change in enumerate(changes):
+            before = old.get(change["id"], {})
+            fields = {c: [before.get(c), v] for c, v in change["values"].items() if before.get(c) != v}
+            entry = {"id": change["id"], "name": before.get("name", change.get("name")),
+                     "source": change["source"], "fields": fields}
+            if out:
+                out.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+            if n < limit:
+                label = f"#{change['id']}" if change["id"] is not None else "new"
+                print(f"  {label} {entry['name']} ({change['source']})")
+                for field, (a, b) in fields.items():
+                    print(f"      {field}: {str(a)[:60]!r} -> {str(b)[:60]!r}")
+    finally:
+        if out:
+            out.close()
+
+
+# -----------------------------
+# Run
+# -----------------------------
+def fetch_destinations():
+    """
+    Returns:
+        db_lookup keyed like the enrich scripts' ({"id", "tags"} values),
+        and id -> stored enrichment_hash
+    """
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, name, city, state, country, tags, enrichment_hash FROM destinations ORDER BY id")
+        rows = cursor.fetchall()
+        cursor.close()
+    db_lookup = {
+        (r[1].strip().lower(), str(r[2]).strip().lower(), str(r[3]).strip().lower(), str(r[4]).strip().lower()): {
+            "id": r[0],
+            "tags": r[5] if r[5] else []
+        }
+        for r in rows if r[1]
+    }
+    return db_lookup, {r[0]: r[6] for r in rows}
+
+def plan_changes(sources, full, stats):
+    """
+    Runs the load -> ... -> diff stages and returns the changes to write.
+    """
+    db_lookup, stored_hashes = fetch_destinations()
+    records = match(normalize(load_sources(sources)), db_lookup, stats)
+    if ENRICH_WORKERS > 1:
+        with ProcessPoolExecutor(max_workers=ENRICH_WORKERS) as executor:
+            return diff(extract(records, executor), stored_hashes, stats, full)
+    return diff(extract(records), stored_hashes, stats, full)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incremental enrichment of destinations from all sources")
+    parser.add_argument("--sources", default=",".join(SOURCE_FILES),
+                        help=f"Comma-separated, in pass order (default: {','.join(SOURCE_FILES)})")
+    parser.add_argument("--dry-run", action="store_true", help="Report the changes without writing")
+    parser.add_argument("--report", help="With --dry-run, write every change as JSON lines to this file")
+    parser.add_argument("--limit", type=int, default=20, help="Changes shown by --dry-run")
+    parser.add_argument("--full", action="store_true", help="Ignore stored content hashes")
+    parser.add_argument("--restart", action="store_true", help="Discard the checkpoint of an interrupted run")
+    args = parser.parse_args()
+    sources = [s.strip() for s in args.sources.split(",") if s.strip()]
+    unknown = [s for s in sources if s not in SOURCE_FILES]
+    if unknown:
+        parser.error(f"unknown sources: {', '.join(unknown)}")
+
+    fp = fingerprint(sources, args.full)
+    resumed = None if args.dry_run or args.restart else load_checkpoint(fp)
+    started = time.time()
+    if resumed:
+        changes, written = resumed
+        print(f"↩️ Resuming interrupted run: {written}/{len(changes)} rows already written")
+    else:
+        stats = Counter()
+        changes, written = plan_changes(sources, args.full, stats), 0
+        print(f"🔎 Planned {len(changes)} changes in {time.time() - started:.1f}s")
+        if args.dry_run:
+            report(changes, stats, args.limit, args.report)
+            raise SystemExit(0)
+        save_plan(fp, changes)
+
+    updated, inserted = write(changes, written)
+    clear_checkpoint()
+    print(f"✅ Enrichment complete: {updated} updated, {inserted} inserted in {time.time() - started:.1f}s.")
@@ -1,8 +1,8 @@
 import pandas as pd
-import psycopg2
-import re
-from fuzzywuzzy import fuzz
 from db_setup import get_connection, close_connection
+from batch_writer import BatchWriter
+from enrichment import TRAITS, extract_traits_and_tags
+from matching import COUNTRY, NAME, DestinationMatcher, index_keys
 
 # Load all datasets
 usa_df = pd.read_csv("datasets/cleaned_data_USA_with_descriptions.csv")
@@ -20,52 +20,6 @@ destinations_df.rename(columns={"Description": "description", "Cost of Living":
 luxury_map = {"Low": 1, "Medium": 3, "Medium-high": 4, "High": 5}
 destinations_df["luxury_score"] = destinations_df["cost"].map(lambda x: luxury_map.get(str(x).strip().title(), None) if pd.notna(x) else None)
 
-# Trait and tag keywords
-trait_keywords = {
-    "adventure": ["hike", "trek", "adventure", "zipline", "kayak", "climb", "safari", "rafting", "outdoor"],
-    "relax": ["relax", "spa", "quiet", "peaceful", "calm", "serene", "retreat"],
-    "nature": ["park", "mountain", "forest", "valley", "lake", "trail", "wildlife", "waterfall"],
-    "culture": ["museum", "historic", "heritage", "culture", "tradition", "site"],
-    "luxury": ["luxury", "fine dining", "resort", "exclusive", "high-end", "5-star"]
-}
-tag_keywords = {
-    "beach": ["beach", "coast", "island", "seaside", "shore", "waves", "bay", "lagoon"],
-    "mountain": ["mountain", "hill", "peak", "range", "ridge", "summit"],
-    "desert": ["desert", "dune", "sands", "arid", "oasis"],
-    "spiritual": ["temple", "ashram", "pilgrimage", "spiritual", "monastery", "holy", "divine"],
-    "wildlife": ["safari", "national park", "jungle", "wildlife", "zoo", "reserve", "nature trail", "animal"],
-    "historic": ["fort", "ruins", "monument", "castle", "citadel", "tomb"],
-    "urban": ["shopping", "nightlife", "skyline", "market", "restaurant", "bar", "café", "street food", "bustling"]
-}
-
-def extract_traits_and_tags(text, existing_tags=None):
-    text = str(text).lower() if pd.notna(text) else ""
-    traits = {key: 0 for key in trait_keywords}
-    tags = set(existing_tags) if existing_tags else set()
-
-    for trait, words in trait_keywords.items():
-        for word in words:
-            if re.search(rf"\b{re.escape(word)}\b", text):
-                traits[trait] += 1
-
-    for tag, words in tag_keywords.items():
-        for word in words:
-            if re.search(rf"\b{re.escape(word)}\b", text):
-                tags.add(tag)
-
-    return list(tags), traits
-
-def match_destination(name, city, state, db_lookup, country):
-    key = (name.strip().lower(), str(city).strip().lower(), str(state).strip().lower(), country.lower())
-    if key in db_lookup:
-        return db_lookup[key]["id"]
-    for k in db_lookup:
-        if k[3] == country.lower():
-            score = fuzz.token_sort_ratio(" ".join(key[:3]), " ".join(k[:3]))
-            if score > 90:
-                return db_lookup[k]["id"]
-    return None
-
 # Connect to DB and fetch all destinations
 conn = get_connection()
 cursor = conn.cursor()
@@ -79,32 +33,27 @@ db_lookup = {
     }
     for r in rows
 }
+matcher = DestinationMatcher(db_lookup)
+by_name_country = index_keys(db_lookup, NAME, COUNTRY)
 
 updated, inserted = 0, 0
+writer = BatchWriter(["description", "tags"] + TRAITS, label="destinations")
 
 # Enrich USA
-for _, row in usa_df.iterrows():
+usa_matches = matcher.match_many(zip(usa_df["name"], usa_df["city"], usa_df["state"]), "USA")
+for (_, row), match_id in zip(usa_df.iterrows(), usa_matches):
     name, city, state = row["name"], row["city"], row["state"]
     desc = row["description"]
     tag_text = str(row.get("categories", "")) + " " + str(row.get("main_category", ""))
     tag_list = list(set(tag_text.lower().split(",")))
     traits = extract_traits_and_tags(desc)[1]
-    match_id = match_destination(name, city, state, db_lookup, "USA")
     if match_id:
-        cursor.execute("""
-            UPDATE destinations SET
-                description = %s, tags = %s,
-                adventure = %s, relax = %s, nature = %s, culture = %s, luxury = %s
-            WHERE id = %s
-        """, (
-            desc, tag_list,
-            traits["adventure"], traits["relax"], traits["nature"],
-            traits["culture"], traits["luxury"], match_id
-        ))
+        writer.add(match_id, [desc, tag_list] + [traits[t] for t in TRAITS])
         updated += 1
 
 # Enrich Iran
-for _, row in iran_df.iterrows():
+iran_matches = matcher.match_many([(row["name"], row.get("city", ""), "") for _, row in iran_df.iterrows()], "Iran")
+for (_, row), match_id in zip(iran_df.iterrows(), iran_matches):
     name, city = row["name"], row.get("city", "")
     desc = f"{name} is a place of interest in Iran known for its tourism and cultural value."
     tags = []
@@ -113,37 +62,16 @@ for _, row in iran_df.iterrows():
         if isinstance(val, str):
             tags.append(val.lower())
     traits = extract_traits_and_tags(" ".join(tags))[1]
-    match_id = match_destination(name, city, "", db_lookup, "Iran")
     if match_id:
-        cursor.execute("""
-            UPDATE destinations SET
-                description = %s, tags = %s,
-                adventure = %s, relax = %s, nature = %s, culture = %s, luxury = %s
-            WHERE id = %s
-        """, (
-            desc, tags,
-            traits["adventure"], traits["relax"], traits["nature"],
-            traits["culture"], traits["luxury"], match_id
-        ))
+        writer.add(match_id, [desc, tags] + [traits[t] for t in TRAITS])
         updated += 1
 
 # Enrich Holidify (India)
 for _, row in holidify_df.iterrows():
-    key = (row["City"], "", "", "india")
-    for k in db_lookup:
-        if k[0] == row["City"] and k[3] == "india":
-            new_tags, traits = extract_traits_and_tags(row["description"], db_lookup[k]["tags"])
-            cursor.execute("""
-                UPDATE destinations SET
-                    description = %s, tags = %s,
-                    adventure = %s, relax = %s, nature = %s, culture = %s, luxury = %s
-                WHERE id = %s
-            """, (
-                row["description"], new_tags,
-                traits["adventure"], traits["relax"], traits["nature"],
-                traits["culture"], traits["luxury"], db_lookup[k]["id"]
-            ))
-            updated += 1
+    for k in by_name_country.get((row["City"], "india"), []):
+        new_tags, traits = extract_traits_and_tags(row["description"], db_lookup[k]["tags"])
+        writer.add(db_lookup[k]["id"], [row["description"], new_tags] + [traits[t] for t in TRAITS])
+        updated += 1
 
 # Enrich/Add from destinations.csv
 for _, row in destinations_df.iterrows():
@@ -154,18 +82,9 @@ for _, row in destinations_df.iterrows():
     lux = int(row["luxury_score"]) if pd.notna(row["luxury_score"]) else None
     new_tags, traits = extract_traits_and_tags(desc)
     traits["luxury"] = lux or traits["luxury"]
-    match = [k for k in db_lookup if k[0] == name and k[3] == country]
+    match = by_name_country.get((name, country))
     if match:
-        cursor.execute("""
-            UPDATE destinations SET
-                description = %s, tags = %s,
-                adventure = %s, relax = %s, nature = %s, culture = %s, luxury = %s
-            WHERE id = %s
-        """, (
-            desc, new_tags,
-            traits["adventure"], traits["relax"], traits["nature"],
-            traits["culture"], traits["luxury"], db_lookup[match[0]]["id"]
-        ))
+        writer.add(db_lookup[match[0]]["id"], [desc, new_tags] + [traits[t] for t in TRAITS])
         updated += 1
     else:
         cursor.execute("""
@@ -181,6 +100,7 @@ for _, row in destinations_df.iterrows():
         inserted += 1
 
 # Finalize
+writer.flush()
 conn.commit()
 close_connection(conn, cursor)
 print(f"✅ Enrichment complete: {updated} updated, {inserted} inserted.")
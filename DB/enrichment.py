@@ -0,0 +1,150 @@
+import re
+
+import pandas as pd
+
+# Trait and tag keywords
+TRAIT_KEYWORDS = {
+    "adventure": ["hike", "trek", "adventure", "zipline", "kayak", "climb", "safari", "rafting", "outdoor"],
+    "relax": ["relax", "spa", "quiet", "peaceful", "calm", "serene", "retreat"],
+    "nature": ["park", "mountain", "forest", "valley", "lake", "trail", "wildlife", "waterfall"],
+    "culture": ["museum", "historic", "heritage", "culture", "tradition", "site"],
+    "luxury": ["luxury", "fine dining", "resort", "exclusive", "high-end", "5-star"]
+}
+TAG_KEYWORDS = {
+    "beach": ["beach", "coast", "island", "seaside", "shore", "waves", "bay", "lagoon"],
+    "mountain": ["mountain", "hill", "peak", "range", "ridge", "summit"],
+    "desert": ["desert", "dune", "sands", "arid", "oasis"],
+    "spiritual": ["temple", "ashram", "pilgrimage", "spiritual", "monastery", "holy", "divine"],
+    "wildlife": ["safari", "national park", "jungle", "wildlife", "zoo", "reserve", "nature trail", "animal"],
+    "historic": ["fort", "ruins", "monument", "castle", "citadel", "tomb"],
+    "urban": ["shopping", "nightlife", "skyline", "market", "restaurant", "bar", "café", "street food", "bustling"]
+}
+TRAITS = list(TRAIT_KEYWORDS)
+
+
+def _prefix_of(short, long):
+    # Would \bshort\b also match at the start of every match of \blong\b?
+    if not long.startswith(short) or len(long) == len(short):
+        return False
+    return re.fullmatch(rf"\b{re.escape(short)}\b.*", long, re.DOTALL) is not None
+
+
+class KeywordMatcher:
+    """
+    All trait and tag keywords compiled into one alternation regex. A text
+    is scanned once; each keyword found counts one hit for its trait and
+    adds its tag, exactly like one re.search(rf"\\b{word}\\b") per keyword.
+    """
+
+    def __init__(self, trait_keywords=TRAIT_KEYWORDS, tag_keywords=TAG_KEYWORDS):
+        self.traits = list(trait_keywords)
+        self.tags = list(tag_keywords)
+        self.keyword_traits = {}
+        self.keyword_tags = {}
+        for trait, words in trait_keywords.items():
+            for word in words:
+                self.keyword_traits.setdefault(word, []).append(trait)
+        for tag, words in tag_keywords.items():
+            for word in words:
+                self.keyword_tags.setdefault(word, []).append(tag)
+
+        # Matches are found with a zero-width lookahead so overlapping keywords
+        # ("national park" and "park") are all seen. Only one alternative can
+        # match per position, so keywords that are a word-prefix of another
+        # ("street" / "street food") go into separate patterns.
+        keywords = sorted(set(self.keyword_traits) | set(self.keyword_tags), key=len, reverse=True)
+        layers = []
+        for word in keywords:
+            for layer in layers:
+                if not any(_prefix_of(word, other) for other in layer):
+                    layer.append(word)
+                    break
+            else:
+                layers.append([word])
+        self.patterns = [
+            re.compile(r"(?=\b(" + "|".join(re.escape(w) for w in layer) + r")\b)")
+            for layer in layers
+        ]
+
+    def keywords(self, text):
+        """
+        The set of keywords found in text (lowercased first; NaN/None is empty).
+        """
+        if text is None or (not isinstance(text, str) and pd.isna(text)):
+            return set()
+        text = str(text).lower()
+        if len(self.patterns) == 1:
+            return set(self.patterns[0].findall(text))
+        found = set()
+        for pattern in self.patterns:
+            found.update(pattern.findall(text))
+        return found
+
+    def extract(self, text, existing_tags=None):
+        """
+        Args:
+            text: description (any value; NaN/None count as empty)
+            existing_tags: tags to keep, in front of the new ones
+        Returns:
+            (tags, traits): list of tags, dict of keyword hits per trait
+        """
+        traits = dict.fromkeys(self.traits, 0)
+        hit_tags = set()
+        for word in self.keywords(text):
+            for trait in self.keyword_traits.get(word, ()):
+                traits[trait] += 1
+            hit_tags.update(self.keyword_tags.get(word, ()))
+        tags = list(dict.fromkeys(existing_tags)) if existing_tags else []
+        tags.extend(tag for tag in self.tags if tag in hit_tags and tag not in tags)
+        return tags, traits
+
+    def extract_many(self, texts, existing_tags=None):
+        """
+        Lazily extracts (tags, traits) for every text of an iterable.
+        Args:
+            texts: iterable of descriptions (list, Series, generator, ...)
+            existing_tags: optional iterable of tag lists, parallel to texts
+        """
+        if existing_tags is None:
+            for text in texts:
+                yield self.extract(text)
+        else:
+            for text, tags in zip(texts, existing_tags):
+                yield self.extract(text, tags)
+
+    def extract_frame(self, texts, existing_tags=None):
+        """
+        Extracts a whole column at once.
+        Args:
+            texts: pandas Series (or iterable) of descriptions
+            existing_tags: optional Series/iterable of tag lists, aligned with texts
+        Returns:
+            DataFrame with a "tags" column and one column per trait, on the index of texts
+        """
+        index = texts.index if isinstance(texts, pd.Series) else None
+        tags, counts = [], []
+        for row_tags, traits in self.extract_many(texts, existing_tags):
+            tags.append(row_tags)
+            counts.append([traits[t] for t in self.traits])
+        frame = pd.DataFrame(counts, columns=self.traits, index=index, dtype="int64")
+        frame.insert(0, "tags", pd.Series(tags, index=frame.index, dtype=object))
+        return frame
+
+
+_default_matcher = None
+
+def default_matcher():
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = KeywordMatcher()
+    return _default_matcher
+
+def extract_traits_and_tags(text, existing_tags=None):
+    """
+    Returns:
+        (tags, traits) of text with the default keywords
+    """
+    return default_matcher().extract(text, existing_tags)
+
+def extract_frame(texts, existing_tags=None):
+    return default_matcher().extract_frame(texts, existing_tags)
@@ -0,0 +1,66 @@
+import pandas as pd
+from db_setup import connection
+from batch_writer import BatchWriter
+from matching import COUNTRY, NAME, index_keys
+
+# Backfills destinations.latitude/longitude (DB/migrations/003_destinations_coordinates.sql)
+# from the datasets that carry them. Rows inserted later by DB/add_more_India_places.py
+# get their coordinates from bulk_load directly; rerun this after the enrich scripts
+# insert destinations.csv entries.
+
+def coordinates(lat, lon):
+    lat, lon = pd.to_numeric(lat, errors="coerce"), pd.to_numeric(lon, errors="coerce")
+    if pd.isna(lat) or pd.isna(lon) or not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None
+    return [float(lat), float(lon)]
+
+def key_part(value):
+    return str(value).strip().lower()
+
+# places.csv rows were loaded under their full (name, city, state, India) key
+places_df = pd.read_csv("datasets/places.csv", encoding="ISO-8859-1")
+places = [
+    ((key_part(row["popular_destination"]), key_part(row["city"]), key_part(row["state"]), "india"),
+     coordinates(row["latitude"], row["longitude"]))
+    for _, row in places_df.iterrows()
+]
+
+# destinations.csv entries are matched by (name, country), like the enrich scripts do
+destinations_df = pd.read_csv("datasets/destinations.csv", encoding="ISO-8859-1")
+destinations = [
+    ((key_part(row["Destination"]), key_part(row["Country"])), coordinates(row["Latitude"], row["Longitude"]))
+    for _, row in destinations_df.iterrows()
+]
+
+with connection() as conn:
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, name, city, state, country, latitude, longitude FROM destinations")
+    rows = cursor.fetchall()
+    cursor.close()
+
+db_lookup = {
+    (key_part(r[1]), key_part(r[2]), key_part(r[3]), key_part(r[4])): {"id": r[0], "coordinates": [r[5], r[6]]}
+    for r in rows if r[1]
+}
+by_name_country = index_keys(db_lookup, NAME, COUNTRY)
+
+# (destination keys, coordinates) per source row, places.csv first
+matches = [([key] if key in db_lookup else [], point) for key, point in places]
+matches += [(by_name_country.get(key, []), point) for key, point in destinations]
+
+# Destination key -> coordinates; a later source row for the same destination wins
+updates, missing = {}, 0
+for keys, point in matches:
+    if point is None or not keys:
+        missing += 1
+        continue
+    for key in keys:
+        updates[key] = point
+
+changed = [key for key, point in updates.items() if db_lookup[key]["coordinates"] != point]
+with BatchWriter(["latitude", "longitude"], label="coordinates") as writer:
+    for key in changed:
+        writer.add(db_lookup[key]["id"], updates[key])
+
+print(f"✅ Coordinates loaded: {len(changed)} updated, {len(updates) - len(changed)} unchanged, "
+      f"{missing} source rows without a destination or coordinates.")
@@ -1,5 +1,4 @@
-from db_setup import get_connection, close_connection
-import pandas as pd
+from bulk_load import bulk_load, read_chunks
 import os
 
 # List of CSV files and their associated country
@@ -9,21 +8,10 @@ datasets = [
     ('datasets/cleaned_data_Iran.csv', "Iran"),
 ]
 
-conn = get_connection()
-if not conn:
-    exit("🛑 Could not establish DB connection.")
-
-cursor = conn.cursor()
-
-for csv_file, country in datasets:
-    if not os.path.exists(csv_file):
-        print(f"⚠️ File not found: {csv_file}")
-        continue
-
-    df = pd.read_csv(csv_file)
-
+def prepare(df, country):
     # Clean data
     df["name"] = df["name"].str.strip()
+    df["country"] = country
     df["type"] = df["main_category"].fillna("").str.strip()
     df["tags"] = df["categories"].fillna("").apply(lambda x: [tag.strip() for tag in x.split(",") if tag.strip()])
 
@@ -33,36 +21,21 @@ for csv_file, country in datasets:
     df["nature"] = 3
     df["culture"] = 4
     df["luxury"] = 2
+    return df
+
+for csv_file, country in datasets:
+    if not os.path.exists(csv_file):
+        print(f"⚠️ File not found: {csv_file}")
+        continue
 
-    for _, row in df.iterrows():
-        try:
-            cursor.execute("""
-                INSERT INTO destinations (
-                    name, city, state, country, type,
-                    tags, rating, reviews, adventure, relax,
-                    nature, culture, luxury, description
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
-                row.get("name"),
-                row.get("city", None),
-                row.get("state", None),
-                country,
-                row.get("type", None),
-                row.get("tags", []),
-                row.get("rating", None),
-                row.get("reviews", None),
-                row["adventure"],
-                row["relax"],
-                row["nature"],
-                row["culture"],
-                row["luxury"],
-                row.get("description", None)
-            ))
-        except Exception as e:
-            print(f"❌ Error inserting {row.get('name')}: {e}")
+    try:
+        stats = bulk_load(read_chunks(csv_file, lambda chunk: prepare(chunk, country)), label="places")
+    except Exception as e:
+        exit(f"🛑 Could not load {csv_file}: {e}")
 
-    print(f"✅ Finished inserting from {csv_file}\n")
+    print(f"✅ Finished inserting from {csv_file}: {stats['inserted']} inserted, {stats['skipped']} skipped (already exists)")
+    if stats["failed_chunks"]:
+        print(f"⚠️ Failed chunks: {stats['failed_chunks']}")
+    print()
 
-conn.commit()
-close_connection(conn, cursor)
 print("✅ All data inserted cleanly.")
@@ -0,0 +1,156 @@
+import re
+from collections import defaultdict
+
+import numpy as np
+from rapidfuzz import process
+from rapidfuzz.distance import Indel
+
+# A fuzzy match needs token_sort_ratio > FUZZY_THRESHOLD (0-100, like fuzzywuzzy)
+FUZZY_THRESHOLD = 90
+NGRAM = 3
+# Queries scored together in one cdist call
+MATCH_BATCH_SIZE = 256
+
+# Positions in the (name, city, state, country) keys of db_lookup
+NAME, CITY, STATE, COUNTRY = range(4)
+
+_ascii_drop = {i: None for i in range(128, 256)}
+_non_word = re.compile(r"(?ui)\W")
+
+
+def sort_key(text):
+    """
+    fuzzywuzzy's token_sort_ratio preprocessing: drops Latin-1 characters,
+    turns non-alphanumerics into spaces, lowercases and sorts the tokens.
+    """
+    text = _non_word.sub(" ", str(text).translate(_ascii_drop)).lower()
+    return " ".join(sorted(text.split()))
+
+def ngrams(text, n=NGRAM):
+    return {text[i:i + n] for i in range(max(len(text) - n + 1, 1))} if text else set()
+
+def index_keys(db_lookup, *positions):
+    """
+    Secondary index over the keys of db_lookup, built once instead of
+    scanning every key per source row.
+    Args:
+        positions: key fields to index by, e.g. index_keys(db_lookup, NAME, COUNTRY)
+    Returns:
+        dict from those fields (a tuple) to the matching keys, in db_lookup order
+    """
+    index = defaultdict(list)
+    for key in db_lookup:
+        index[tuple(key[p] for p in positions)].append(key)
+    return index
+
+
+class _Block:
+    """
+    The keys of one country: their sort keys in lookup order, lengths and
+    an n-gram -> positions inverted index.
+    """
+
+    def __init__(self, texts, ids):
+        self.texts = texts
+        self.ids = ids
+        self.lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts))
+        postings = defaultdict(list)
+        for position, text in enumerate(texts):
+            for gram in ngrams(text):
+                postings[gram].append(position)
+        self.postings = {gram: np.asarray(p, dtype=np.int64) for gram, p in postings.items()}
+
+    def candidates(self, query, threshold):
+        """
+        Positions that can still score above threshold against query. The
+        filters only drop keys that provably cannot: the indel ratio bounds
+        the length difference, and every edit destroys at most NGRAM of the
+        query's distinct n-grams.
+        """
+        # round(100 * ratio) > threshold  =>  ratio > (threshold + 0.5) / 100 (minus float slack)
+        ratio = (threshold + 0.5) / 100 - 1e-9
+        length = len(query)
+        lo, hi = length * ratio / (2 - ratio), length * (2 - ratio) / ratio
+        in_window = (self.lengths >= lo) & (self.lengths <= hi)
+        # Indel distance allowed against the longest key in the window
+        max_edits = int((length + min(hi, self.lengths.max(initial=0))) * (1 - ratio))
+        grams = ngrams(query)
+        needed = len(grams) - NGRAM * max_edits
+        if needed <= 0:
+            return np.flatnonzero(in_window)
+        hits = [self.postings[g] for g in grams if g in self.postings]
+        if not hits:
+            return np.empty(0, dtype=np.int64)
+        shared = np.bincount(np.concatenate(hits), minlength=len(self.texts))
+        return np.flatnonzero(in_window & (shared >= needed))
+
+
+class DestinationMatcher:
+    """
+    match_destination() over a db_lookup dict keyed by (name, city, state,
+    country): an exact key wins, otherwise the first key of the same country
+    (in db_lookup order) whose name/city/state has a token_sort_ratio above
+    the threshold. Keys are blocked by country and pruned with an n-gram
+    index; the survivors are scored with rapidfuzz.process.cdist.
+    """
+
+    def __init__(self, db_lookup, threshold=FUZZY_THRESHOLD, workers=-1):
+        self.threshold = threshold
+        self.workers = workers
+        self.exact = {key: _id_of(value) for key, value in db_lookup.items()}
+        by_country = defaultdict(lambda: ([], []))
+        for key, value in db_lookup.items():
+            texts, ids = by_country[key[3]]
+            texts.append(sort_key(" ".join(key[:3])))
+            ids.append(_id_of(value))
+        self.blocks = {country: _Block(texts, ids) for country, (texts, ids) in by_country.items()}
+
+    @staticmethod
+    def key(name, city, state, country):
+        return (name.strip().lower(), str(city).strip().lower(), str(state).strip().lower(), country.lower())
+
+    def match(self, name, city, state, country):
+        """
+        Returns:
+            id of the matching destination, or None
+        """
+        return self.match_many([(name, city, state)], country)[0]
+
+    def match_many(self, rows, country, batch_size=MATCH_BATCH_SIZE):
+        """
+        Matches many (name, city, state) rows of one country at once.
+        Returns:
+            list of ids (None where nothing matches), parallel to rows
+        """
+        keys = [self.key(name, city, state, country) for name, city, state in rows]
+        results = [self.exact.get(key) for key in keys]
+        block = self.blocks.get(country.lower())
+        if block is None:
+            return results
+
+        pending = [i for i, found in enumerate(results) if found is None]
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            queries = [sort_key(" ".join(keys[i][:3])) for i in batch]
+            # Any surviving column is a true candidate, so the union can be scored together
+            columns = np.unique(np.concatenate(
+                [block.candidates(q, self.threshold) for q in queries] + [np.empty(0, dtype=np.int64)]
+            ))
+            if not len(columns):
+                continue
+            # Same similarity as python-Levenshtein's ratio(), which fuzzywuzzy
+            # scales to 0-100 and rounds to an int before the comparison
+            scores = process.cdist(
+                queries, [block.texts[c] for c in columns], scorer=Indel.normalized_similarity,
+                score_cutoff=self.threshold / 100, dtype=np.float64, workers=self.workers,
+            )
+            passed = np.rint(100 * scores) > self.threshold
+            for row, i in enumerate(batch):
+                hits = np.flatnonzero(passed[row])
+                if len(hits):
+                    results[i] = block.ids[columns[hits[0]]]
+        return results
+
+
+def _id_of(value):
+    return value["id"] if isinstance(value, dict) else value
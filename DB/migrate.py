@@ -0,0 +1,34 @@
+import glob
+import os
+from db_setup import connection
+
+# Schema migrations: DB/migrations/NNN_name.sql, applied once each, in order
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+with connection(statement_timeout=0) as conn:
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            name TEXT PRIMARY KEY,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+    """)
+    cursor.execute("SELECT name FROM schema_migrations")
+    applied = {row[0] for row in cursor.fetchall()}
+    conn.commit()
+
+    pending = [path for path in sorted(glob.glob(os.path.join(MIGRATIONS_DIR, "*.sql")))
+               if os.path.basename(path) not in applied]
+    for path in pending:
+        name = os.path.basename(path)
+        with open(path) as f:
+            sql = f.read()
+        # Each migration and its bookkeeping row commit together
+        cursor.execute(sql)
+        cursor.execute("INSERT INTO schema_migrations (name) VALUES (%s)", (name,))
+        conn.commit()
+        print(f"✅ Applied {name}")
+
+    cursor.close()
+
+print(f"✅ Schema up to date ({len(applied) + len(pending)} migrations)")
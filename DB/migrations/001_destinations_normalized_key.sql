@@ -0,0 +1,19 @@
+-- One row per normalized (name, city, state, country): trimmed, lower-cased,
+-- missing parts compared as ''. Imports rely on this index for
+-- INSERT ... ON CONFLICT DO NOTHING instead of per-row existence checks.
+
+-- Existing duplicates keep their oldest row
+DELETE FROM destinations d
+USING destinations keep
+WHERE keep.id < d.id
+    AND lower(btrim(keep.name)) = lower(btrim(d.name))
+    AND lower(btrim(coalesce(keep.city, ''))) = lower(btrim(coalesce(d.city, '')))
+    AND lower(btrim(coalesce(keep.state, ''))) = lower(btrim(coalesce(d.state, '')))
+    AND lower(btrim(coalesce(keep.country, ''))) = lower(btrim(coalesce(d.country, '')));
+
+CREATE UNIQUE INDEX IF NOT EXISTS destinations_normalized_key ON destinations (
+    (lower(btrim(name))),
+    (lower(btrim(coalesce(city, '')))),
+    (lower(btrim(coalesce(state, '')))),
+    (lower(btrim(coalesce(country, ''))))
+);
@@ -0,0 +1,4 @@
+-- Content hash of the enriched fields (description, tags, traits) as last
+-- written by DB/enrich_pipeline.py. Reruns skip rows whose new values hash
+-- the same, without fetching and comparing the descriptions themselves.
+ALTER TABLE destinations ADD COLUMN IF NOT EXISTS enrichment_hash TEXT;
@@ -0,0 +1,6 @@
+-- WGS84 coordinates in degrees, from the Latitude/Longitude columns of
+-- datasets/destinations.csv and datasets/places.csv (DB/load_coordinates.py).
+-- The recommender builds its spatial index from them; rows left NULL are
+-- never returned by radius queries.
+ALTER TABLE destinations ADD COLUMN IF NOT EXISTS latitude DOUBLE PRECISION;
+ALTER TABLE destinations ADD COLUMN IF NOT EXISTS longitude DOUBLE PRECISION;
@@ -1,71 +1,266 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
 from flask import Flask
 from flask_cors import CORS
+from functools import wraps
+import logging
 import os
+import time
 
 from app.recommender import (
-    recommend_by_query,
-    recommend_by_traits,
-    recommend_hybrid,
-    recommend_by_vibe,
-    df
+    rank_by_query,
+    rank_by_traits,
+    rank_hybrid,
+    rank_near,
+    rank_by_vibe,
+    rank_batch,
+    batch_records,
+    records,
+    render_batch_json,
+    render_json,
+    current_model,
+    model_version,
+    similarity_stats,
+    start_refresher,
+    suggest_destinations
 )
+from app.metrics import (
+    METRICS_ENABLED,
+    bind_endpoint,
+    log_sampled,
+    observe_request,
+    render_metrics,
+    stage
+)
+from app.filters import parse_filters
+from app.geo import parse_geo
+from app.refresh import MODEL_REFRESH_INTERVAL
+from app.response_cache import build_response_cache, make_key
+
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO"))
 
 app = Flask(__name__)
 CORS(app, origins=["http://localhost:3000", "https://lambent-cupcake-a5d59e.netlify.app"])
+response_cache = build_response_cache()
+# Send "X-Cache-Bypass: 1" to skip the response cache when debugging
+CACHE_BYPASS_HEADER = "X-Cache-Bypass"
+TRAIT_KEYS = ["adventure", "relax", "nature", "culture", "luxury"]
+
+refresher_pid = None
+
+def create_app():
+    """
+    WSGI application factory, used by gunicorn.conf.py ("app.app:create_app()").
+    The model is built when app.recommender is imported. With preload_app that
+    happens once in the master, and it is frozen here so that the forked
+    workers only read its buffers.
+    """
+    current_model().freeze()
+    return app
+
+def ensure_refresher():
+    # Threads do not survive fork, so the refresher starts in the process that serves requests
+    global refresher_pid
+    if MODEL_REFRESH_INTERVAL > 0 and refresher_pid != os.getpid():
+        refresher_pid = os.getpid()
+        start_refresher()
+
+@app.before_request
+def pin_model():
+    ensure_refresher()
+    # Every request works on one model snapshot, even if a reload swaps it mid-request
+    g.model = current_model()
+    if METRICS_ENABLED:
+        g.started = time.perf_counter()
+        bind_endpoint(request.url_rule.rule if request.url_rule else "unmatched")
+
+@app.after_request
+def record_request(response):
+    if METRICS_ENABLED and "started" in g:
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        observe_request(endpoint, response.status_code, time.perf_counter() - g.started)
+    return response
+
+def normalized_query():
+    # Both the cache key and what the rankers match: lowercased, whitespace collapsed
+    query = request.args.get("query")
+    return None if query is None else " ".join(query.lower().split())
+
+def cached(endpoint, key_parts):
+    """
+    Serves successful responses of a view from the response cache. The key is
+    (endpoint, model version, *key_parts()), so a model reload invalidates
+    every entry.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if response_cache is None or request.headers.get(CACHE_BYPASS_HEADER) == "1":
+                response = app.make_response(view(*args, **kwargs))
+                response.headers["X-Cache"] = "BYPASS"
+                return response
+            try:
+                version = model_version(g.model)
+                key = make_key(endpoint, version, *key_parts())
+            except Exception:
+                # Let the view report malformed parameters
+                return view(*args, **kwargs)
+
+            body = response_cache.get(key, version)
+            if body is not None:
+                return Response(body, mimetype="application/json", headers={"X-Cache": "HIT"})
+            response = app.make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response_cache.set(key, response.get_data(), version)
+            response.headers["X-Cache"] = "MISS"
+            return response
+        return wrapper
+    return decorator
+
 # Health check
 @app.route("/")
 def home():
     return {"message": "🚀 Travel Recommender API is running!"}
 
+def fragments_supported():
+    # Pre-rendered fragments match Flask's default compact, sorted, ASCII output only
+    provider = app.json
+    pretty = provider.compact is False or (provider.compact is None and app.debug)
+    return not pretty and getattr(provider, "sort_keys", False) and getattr(provider, "ensure_ascii", False)
+
+def records_response(positions):
+    """
+    Serializes the given destination rows. With Flask's default compact JSON
+    settings the body is joined from pre-rendered fragments; otherwise (e.g.
+    debug pretty-printing) it falls back to jsonify.
+    """
+    if not fragments_supported():
+        with stage("materialize"):
+            rows = records(positions, g.model)
+        with stage("serialize"):
+            return jsonify(rows)
+    # The fragments are already JSON, so gathering them is the materialization step
+    with stage("materialize"):
+        body = render_json(positions, g.model)
+    with stage("serialize"):
+        return Response(body, mimetype=app.json.mimetype)
+
+def fuzzy_enabled():
+    # ?fuzzy=0 disables the typo-tolerant fallback
+    return request.args.get("fuzzy", "1") != "0"
+
+def search_param():
+    # ?search=text: free-text retrieval; ?search=name: no free-text fallback
+    return request.args.get("search", "auto")
+
+def request_filters():
+    # ?country=india&tags_any=beach,temple&min_nature=3&max_luxury=2&min_rating=4 ...
+    return parse_filters(request.args)
+
+def request_geo():
+    # ?radius_km=50[&lat=15.49&lon=73.82][&distance_weight=0.3]
+    return parse_geo(request.args)
+
+# Every recommend endpoint also takes the filter parameters (see parse_filters)
 # GET /recommend?query=Rome&top_n=5
+# GET /recommend?query=quiet beach with temples&search=text (free-text retrieval)
 @app.route("/recommend", methods=["GET"])
+@cached("recommend", lambda: [normalized_query(), int(request.args.get("top_n", 5)), fuzzy_enabled(),
+                              request_filters(), search_param()])
 def recommend():
-    query = request.args.get("query")
+    query = normalized_query()
     top_n = int(request.args.get("top_n", 5))
     try:
-        results = recommend_by_query(query, top_n)
-        print(f"Query: {query}, Top N: {top_n}, Results: {results}")
-        finalResult = results.to_dict(orient="records")
-        return finalResult
+        results = rank_by_query(query, top_n, fuzzy_enabled(), g.model, request_filters(), search_param())
+        log_sampled("recommend", query=query, top_n=top_n, results=results.tolist())
+        return records_response(results)
     except Exception as e:
         return {"error": str(e)}, 400
 
 # GET /recommend-hybrid?query=Rome&top_n=5&alpha=0.7
+# With radius_km: similar destinations within that radius, blending distance into the score
 @app.route("/recommend-hybrid", methods=["GET"])
+@cached("recommend-hybrid", lambda: [normalized_query(), int(request.args.get("top_n", 5)),
+                                     float(request.args.get("alpha", 0.7)), fuzzy_enabled(), request_filters(),
+                                     request_geo(), search_param()])
 def hybrid():
-    query = request.args.get("query")
+    query = normalized_query()
     top_n = int(request.args.get("top_n", 5))
     alpha = float(request.args.get("alpha", 0.7))
     try:
-        results = recommend_hybrid(query, top_n, alpha)
-        return results.to_dict(orient="records")
+        results = rank_hybrid(query, top_n, alpha, fuzzy_enabled(), g.model, request_filters(), request_geo(),
+                              search_param())
+        return records_response(results)
     except Exception as e:
         return {"error": str(e)}, 400
 
 # GET /recommend-traits?query=Rome&top_n=5
 @app.route("/recommend-traits", methods=["GET"])
+@cached("recommend-traits", lambda: [normalized_query(), int(request.args.get("top_n", 5)), fuzzy_enabled(),
+                                     request_filters(), search_param()])
 def traits():
-    query = request.args.get("query")
+    query = normalized_query()
     top_n = int(request.args.get("top_n", 5))
     try:
-        results = recommend_by_traits(query, top_n)
-        return results.to_dict(orient="records")
+        results = rank_by_traits(query, top_n, fuzzy_enabled(), g.model, request_filters(), search_param())
+        return records_response(results)
     except Exception as e:
         return {"error": str(e)}, 400
 
-# POST /recommend-vibe
+# GET /recommend-near?query=Goa&radius_km=50&top_n=5 or ?lat=15.49&lon=73.82&radius_km=50
+# Destinations within radius_km of the point (or of the query's destinations), nearest first
+@app.route("/recommend-near", methods=["GET"])
+@cached("recommend-near", lambda: [normalized_query(), int(request.args.get("top_n", 5)), fuzzy_enabled(),
+                                   request_filters(), request_geo()])
+def near():
+    query = normalized_query()
+    top_n = int(request.args.get("top_n", 5))
+    try:
+        results = rank_near(query, request_geo(), top_n, fuzzy_enabled(), g.model, request_filters())
+        return records_response(results)
+    except Exception as e:
+        return {"error": str(e)}, 400
+
+# POST /recommend-vibe?top_n=5&country=india
 # Body: {"adventure": 5, "relax": 2, "nature": 4, "culture": 1, "luxury": 3}
 @app.route("/recommend-vibe", methods=["POST"])
+@cached("recommend-vibe", lambda: [int(request.args.get("top_n", 5)),
+                                   [float(request.get_json()[t]) for t in TRAIT_KEYS], request_filters()])
 def vibe():
     try:
         user_traits = request.get_json()
         top_n = int(request.args.get("top_n", 5))
-        results = recommend_by_vibe(user_traits, top_n)
-        return results.to_dict(orient="records")
+        results = rank_by_vibe(user_traits, top_n, g.model, request_filters())
+        return records_response(results)
     except Exception as e:
         return {"error": str(e)}, 400
     
+# POST /recommend-batch
+# Body: {"queries": [{"type": "hybrid", "query": "goa", "top_n": 5, "alpha": 0.7, "country": "india"},
+#                    {"type": "vibe", "traits": {"adventure": 5, ...}, "top_n": 3}, ...]}
+# Returns one element per query: a list of destinations or {"error": "..."}
+MAX_BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", 100))
+
+@app.route("/recommend-batch", methods=["POST"])
+def recommend_batch():
+    try:
+        items = request.get_json()["queries"]
+        if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            raise ValueError("'queries' must be a list of objects")
+        if len(items) > MAX_BATCH_SIZE:
+            raise ValueError(f"At most {MAX_BATCH_SIZE} queries per batch")
+        results = rank_batch(items, g.model)
+    except Exception as e:
+        return {"error": str(e)}, 400
+    if not fragments_supported():
+        with stage("materialize"):
+            rows = batch_records(results, g.model)
+        with stage("serialize"):
+            return jsonify(rows)
+    with stage("materialize"):
+        body = render_batch_json(results, g.model)
+    with stage("serialize"):
+        return Response(body, mimetype=app.json.mimetype)
+
 @app.route("/suggest", methods=["GET"])
 def suggest():
     query = request.args.get("q", "").lower()
@@ -74,21 +269,26 @@ def suggest():
 
     try:
         # Get up to 10 matching names or cities
-        matches = df[
-            df["name"].str.lower().fillna("").str.contains(query) |
-            df["city"].str.lower().fillna("").str.contains(query)
-        ][["name", "city", "state", "country"]].drop_duplicates().head(10)
-
-        suggestions = []
-        for _, row in matches.iterrows():
-            parts = [row["name"], row["city"], row["state"], row["country"]]
-            label = ", ".join([p for p in parts if p and isinstance(p, str)])
-            suggestions.append(label)
-
+        suggestions = suggest_destinations(query, 10, fuzzy_enabled(), g.model)
         return jsonify(suggestions)
     except Exception as e:
         return {"error": str(e)}, 500
 
+# GET /cache-stats -> similarity backend and response cache counters
+@app.route("/cache-stats", methods=["GET"])
+def cache_stats():
+    return jsonify({
+        "similarity": similarity_stats(g.model),
+        "responses": response_cache.stats() if response_cache else None,
+    })
+
+# GET /metrics -> Prometheus text format (per process)
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    if not METRICS_ENABLED:
+        return {"error": "Metrics are disabled"}, 404
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))  # default for local dev
     app.run(debug=True, host="0.0.0.0", port=port)  # or change port if needed
@@ -0,0 +1,179 @@
+"""
+Versioned on-disk model artifacts.
+
+    python -m app.artifacts build --out artifacts [--k 50]
+
+writes artifacts/<version>/ and points artifacts/CURRENT at it. Serving
+processes started with MODEL_ARTIFACT_DIR=artifacts open the arrays with
+numpy.load(mmap_mode="r"), so startup does no DB query, TF-IDF fit or
+neighbor search, and all workers share the same pages through the OS page
+cache. The matrices, neighbor lists, free-text postings and rendered record
+fragments are stored as they are served. The substring, fuzzy, filter, geo
+and vibe indexes are still rebuilt from the row store on load, an O(N) pass
+that makes up most of the load time.
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import MinMaxScaler
+
+from app.model import (
+    SIMILARITY_MODE, TRAIT_COLS, Model, build_model, build_similarity, fetch_checksums, load_destinations
+)
+from DB.db_setup import connection
+from app.neighbors import DEFAULT_K, NeighborIndex, build_neighbor_index
+from app.records import RecordStore
+from app.text_search import TextSearchIndex
+
+FORMAT_VERSION = 2
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+ROWS_FILE = "rows.pkl"
+CHECKSUMS_FILE = "checksums.json"
+RECORDS_FILE = "records.bin"
+RECORD_OFFSETS_FILE = "record_offsets.npy"
+SCALER_ATTRS = ["min_", "scale_", "data_min_", "data_max_", "data_range_"]
+
+
+def _save_csr(path, name, matrix):
+    matrix = matrix.tocsr()
+    for part in ("data", "indices", "indptr"):
+        np.save(os.path.join(path, f"{name}_{part}.npy"), getattr(matrix, part))
+
+def _load_csr(path, name, shape):
+    parts = [np.load(os.path.join(path, f"{name}_{part}.npy"), mmap_mode="r")
+             for part in ("data", "indices", "indptr")]
+    return sparse.csr_matrix(tuple(parts), shape=shape, copy=False)
+
+def _neighbor_matrix(similarity, matrix, k):
+    if isinstance(similarity, NeighborIndex):
+        return similarity.matrix
+    return build_neighbor_index(matrix, k)
+
+def save_artifacts(model, out_root, k=DEFAULT_K):
+    """
+    Writes a model to out_root/<version>/ and atomically repoints
+    out_root/CURRENT at it.
+    Returns:
+        path of the written version directory
+    """
+    version = f"{time.strftime('%Y%m%d%H%M%S')}-{model.version}"
+    path = os.path.join(out_root, version)
+    os.makedirs(path)
+
+    n_rows = model.tfidf_matrix.shape[0]
+    with open(os.path.join(path, "vocabulary.json"), "w") as f:
+        json.dump({term: int(i) for term, i in model.tfidf.vocabulary_.items()}, f)
+    np.save(os.path.join(path, "idf.npy"), model.tfidf.idf_)
+    _save_csr(path, "tfidf", model.tfidf_matrix)
+    np.save(os.path.join(path, "traits.npy"), np.ascontiguousarray(model.traits_matrix))
+    np.savez(os.path.join(path, "scaler.npz"), **{attr: getattr(model.scaler, attr) for attr in SCALER_ATTRS})
+    _save_csr(path, "text_neighbors", _neighbor_matrix(model.text_similarity, model.tfidf_matrix, k))
+    _save_csr(path, "trait_neighbors", _neighbor_matrix(model.trait_similarity, model.traits_matrix, k))
+    text_search = model.text_search
+    _save_csr(path, "text_postings", sparse.csr_matrix(
+        (text_search.weights, text_search.docs, text_search.indptr), shape=(len(model.tfidf.vocabulary_), n_rows)))
+    model.records.save(os.path.join(path, RECORDS_FILE), os.path.join(path, RECORD_OFFSETS_FILE))
+    model.df.to_pickle(os.path.join(path, ROWS_FILE))
+    if model.checksums is not None:
+        with open(os.path.join(path, CHECKSUMS_FILE), "w") as f:
+            json.dump({str(i): c for i, c in model.checksums.items()}, f)
+
+    manifest = {
+        "format": FORMAT_VERSION,
+        "version": model.version,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "rows": n_rows,
+        "vocabulary_size": len(model.tfidf.vocabulary_),
+        "neighbor_k": k,
+        "trait_cols": TRAIT_COLS,
+    }
+    with open(os.path.join(path, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    # Publish last so readers never see a partially written version
+    tmp = os.path.join(out_root, CURRENT_FILE + ".tmp")
+    with open(tmp, "w") as f:
+        f.write(version)
+    os.replace(tmp, os.path.join(out_root, CURRENT_FILE))
+    return path
+
+def resolve_artifact_dir(path):
+    """
+    Accepts either a version directory or an artifact root containing CURRENT.
+    """
+    if os.path.exists(os.path.join(path, MANIFEST_FILE)):
+        return path
+    with open(os.path.join(path, CURRENT_FILE)) as f:
+        return os.path.join(path, f.read().strip())
+
+def load_artifacts(path, mode=None):
+    """
+    Opens a model written by save_artifacts. Matrices, postings and record
+    fragments are memory-mapped read-only; the row store and vocabulary are
+    read into memory and the row-level indexes are rebuilt from them.
+    """
+    path = resolve_artifact_dir(path)
+    with open(os.path.join(path, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if manifest["format"] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported artifact format {manifest['format']} in {path}")
+
+    n_rows = manifest["rows"]
+    with open(os.path.join(path, "vocabulary.json")) as f:
+        vocabulary = json.load(f)
+    tfidf = TfidfVectorizer(stop_words="english", vocabulary=vocabulary)
+    tfidf.idf_ = np.load(os.path.join(path, "idf.npy"))
+    tfidf_matrix = _load_csr(path, "tfidf", (n_rows, len(vocabulary)))
+
+    scaler = MinMaxScaler()
+    with np.load(os.path.join(path, "scaler.npz")) as params:
+        for attr in SCALER_ATTRS:
+            setattr(scaler, attr, params[attr])
+    scaler.n_features_in_ = len(manifest["trait_cols"])
+    scaler.feature_names_in_ = np.asarray(manifest["trait_cols"], dtype=object)
+    scaler.n_samples_seen_ = n_rows
+    traits_matrix = np.load(os.path.join(path, "traits.npy"), mmap_mode="r")
+
+    mode = mode or SIMILARITY_MODE
+    if mode == "neighbors":
+        k = manifest["neighbor_k"]
+        text_similarity = NeighborIndex.from_matrix(_load_csr(path, "text_neighbors", (n_rows, n_rows)), k)
+        trait_similarity = NeighborIndex.from_matrix(_load_csr(path, "trait_neighbors", (n_rows, n_rows)), k)
+    else:
+        text_similarity = build_similarity(tfidf_matrix, mode)
+        trait_similarity = build_similarity(traits_matrix, mode)
+
+    df = pd.read_pickle(os.path.join(path, ROWS_FILE))
+    checksums = None
+    if os.path.exists(os.path.join(path, CHECKSUMS_FILE)):
+        with open(os.path.join(path, CHECKSUMS_FILE)) as f:
+            checksums = {int(i): c for i, c in json.load(f).items()}
+    text_search = TextSearchIndex.from_postings(tfidf, _load_csr(path, "text_postings", (len(vocabulary), n_rows)))
+    records = RecordStore.open(os.path.join(path, RECORDS_FILE), os.path.join(path, RECORD_OFFSETS_FILE))
+    model = Model(df, tfidf, tfidf_matrix, scaler, traits_matrix,
+                  text_similarity, trait_similarity, manifest["version"], checksums, records, text_search)
+    model.artifact_path = path
+    return model
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build recommender model artifacts")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="fit the model from the destinations table and persist it")
+    build.add_argument("--out", default="artifacts", help="artifact root directory")
+    build.add_argument("--k", type=int, default=DEFAULT_K, help="neighbors kept per destination")
+    args = parser.parse_args()
+
+    started = time.time()
+    with connection() as conn:
+        checksums = fetch_checksums(conn)
+    model = build_model(load_destinations(), mode="neighbors", k=args.k, checksums=checksums)
+    path = save_artifacts(model, args.out, args.k)
+    print(f"✅ Wrote {model.df.shape[0]} destinations to {path} in {time.time() - started:.1f}s")
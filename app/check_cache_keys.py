@@ -0,0 +1,74 @@
+"""
+Response cache consistency check: requests whose queries differ only in
+case or whitespace share a cache key, so each of them must get exactly the
+body an uncached request (X-Cache-Bypass: 1) gets, whichever variant filled
+the cache first.
+
+Runs on a synthetic catalog (benchmarks/synthetic.py), no PostgreSQL needed:
+
+    python -m app.check_cache_keys --rows 2000 --queries 20
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+ENDPOINTS = [
+    ("/recommend", {}),
+    ("/recommend-hybrid", {}),
+    ("/recommend-traits", {}),
+    ("/recommend-near", {"radius_km": 100}),
+]
+
+
+def variants(query):
+    words = query.split()
+    return [query, f" {query}", f"{query} ", query.upper(), "  ".join(words), f"\t{' '.join(words)}\n"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that cached responses match uncached ones")
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from benchmarks.synthetic import generate
+
+    df = generate(args.rows, args.seed)
+    path = os.path.join(tempfile.mkdtemp(), "destinations.pkl")
+    df.to_pickle(path)
+    os.environ["DESTINATIONS_FILE"] = path
+    os.environ["RESPONSE_CACHE"] = "memory"
+    os.environ["MODEL_REFRESH_INTERVAL"] = "0"
+
+    import app.app as web
+    from app.response_cache import build_response_cache
+
+    client = web.create_app().test_client()
+    rng = random.Random(args.seed)
+    queries = rng.sample(sorted(set(df["name"]) | set(df["city"])), args.queries)
+
+    checked, mismatches = 0, []
+    for endpoint, params in ENDPOINTS:
+        for query in queries:
+            requests = variants(query)
+            uncached = [
+                client.get(endpoint, query_string={**params, "query": q}, headers={web.CACHE_BYPASS_HEADER: "1"})
+                for q in requests
+            ]
+            # Every variant gets to fill the cache once
+            for first in range(len(requests)):
+                web.response_cache = build_response_cache("memory")
+                for i in [first] + [i for i in range(len(requests)) if i != first]:
+                    response = client.get(endpoint, query_string={**params, "query": requests[i]})
+                    checked += 1
+                    if (response.status_code, response.data) != (uncached[i].status_code, uncached[i].data):
+                        mismatches.append((endpoint, requests[first], requests[i]))
+
+    for endpoint, first, query in mismatches[:20]:
+        print(f"❌ {endpoint}: {query!r} after {first!r} differs from the uncached response")
+    print(f"{'✅' if not mismatches else '❌'} {checked - len(mismatches)} of {checked} cached responses "
+          f"match the uncached ones ({len(queries)} queries x {len(ENDPOINTS)} endpoints)")
+    sys.exit(1 if mismatches else 0)
@@ -0,0 +1,62 @@
+"""
+Byte-for-byte check of the pre-rendered record fragments against
+jsonify(df.iloc[positions].to_dict(orient="records")), including values
+psycopg2 can hand back that json cannot encode natively (Decimal from
+NUMERIC, date/datetime, UUID).
+
+Runs on a synthetic catalog (benchmarks/synthetic.py), no PostgreSQL needed:
+
+    python -m app.check_records --rows 500
+"""
+import argparse
+import datetime
+import decimal
+import sys
+import uuid
+
+import numpy as np
+from flask import Flask, jsonify
+
+from app.records import join_records, render_records
+
+
+def with_driver_types(df, rng):
+    """
+    A copy of df whose rating is Decimal (as for a NUMERIC column) and with
+    date, datetime and UUID columns, each NULL in some rows.
+    """
+    df = df.copy()
+    df["rating"] = [None if i % 7 == 0 else decimal.Decimal(f"{r:.1f}") for i, r in enumerate(df["rating"])]
+    days = rng.integers(0, 3650, len(df))
+    df["updated_on"] = [None if i % 5 == 0 else datetime.date(2015, 1, 1) + datetime.timedelta(days=int(d))
+                        for i, d in enumerate(days)]
+    start = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+    df["updated_at"] = [start + datetime.timedelta(hours=int(d)) for d in days]
+    df["uuid"] = [uuid.UUID(int=int(i)) for i in rng.integers(0, 2 ** 62, len(df))]
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check pre-rendered records against jsonify")
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from benchmarks.synthetic import generate
+
+    rng = np.random.default_rng(args.seed)
+    df = with_driver_types(generate(args.rows, args.seed), rng)
+    fragments = render_records(df)
+
+    app = Flask(__name__)
+    samples = [np.arange(len(df))] + [rng.choice(len(df), 10, replace=False) for _ in range(50)]
+    mismatches = 0
+    with app.app_context():
+        for positions in samples:
+            expected = jsonify(df.iloc[positions].to_dict(orient="records")).data
+            if join_records(fragments, positions) != expected:
+                mismatches += 1
+
+    print(f"{'✅' if not mismatches else '❌'} {len(samples) - mismatches} of {len(samples)} bodies match jsonify "
+          f"({len(df)} rows with Decimal, date, datetime and UUID values)")
+    sys.exit(1 if mismatches else 0)
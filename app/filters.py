@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+
+TRAIT_COLS = ["adventure", "relax", "nature", "culture", "luxury"]
+CATEGORY_FIELDS = ("country", "state")
+RANGE_FIELDS = TRAIT_COLS + ["rating"]
+
+
+def _normalize(value):
+    return value.strip().lower() if isinstance(value, str) else ""
+
+def _values(raw):
+    # "india,nepal" (query string) or ["india", "nepal"] (JSON body)
+    if raw is None:
+        return []
+    if isinstance(raw, str):
+        raw = raw.split(",")
+    elif not isinstance(raw, (list, tuple)):
+        raise ValueError(f"Invalid filter value: {raw!r}")
+    return sorted({_normalize(v) for v in raw if _normalize(v)})
+
+def number_param(params, name):
+    raw = params.get(name)
+    if raw is None or raw == "":
+        return None
+    try:
+        return float(raw)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid number for '{name}': {raw!r}")
+
+def parse_filters(params):
+    """
+    Reads the filter parameters of a request:
+        country, state, tags_any, tags_all: comma-separated values (or lists)
+        min_<trait>, max_<trait>, min_rating, max_rating: inclusive bounds
+    Args:
+        params: request.args, or a batch item dict
+    Returns:
+        canonical dict (sorted values, usable as a cache key part), or None
+        when the request sets no filter
+    """
+    filters = {}
+    for field in CATEGORY_FIELDS + ("tags_any", "tags_all"):
+        values = _values(params.get(field))
+        if values:
+            filters[field] = values
+    for field in RANGE_FIELDS:
+        low, high = number_param(params, f"min_{field}"), number_param(params, f"max_{field}")
+        if low is not None or high is not None:
+            filters[field] = [low, high]
+    return filters or None
+
+
+class _Postings:
+    """
+    Rows grouped by value: the rows of value v are
+    order[starts[codes[v]]:starts[codes[v] + 1]], in row order.
+    """
+
+    def __init__(self, values, rows, n_rows):
+        ids, uniques = pd.factorize(pd.Series(values, dtype=object))
+        self.codes = {value: i for i, value in enumerate(uniques)}
+        order = np.argsort(ids, kind="stable")
+        self.order = np.asarray(rows, dtype=np.intp)[order]
+        self.starts = np.concatenate(([0], np.cumsum(np.bincount(ids, minlength=len(uniques)))))
+        self.n_rows = n_rows
+
+    def rows(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            return self.order[:0]
+        return self.order[self.starts[code]:self.starts[code + 1]]
+
+    def any_of(self, values):
+        mask = np.zeros(self.n_rows, dtype=bool)
+        for value in values:
+            mask[self.rows(value)] = True
+        return mask
+
+    def all_of(self, values):
+        # A row appears at most once per value, so it has them all iff it appears len(values) times
+        hits = np.zeros(self.n_rows, dtype=np.int32)
+        for value in values:
+            hits[self.rows(value)] += 1
+        return hits == len(values)
+
+
+class _SortedColumn:
+    """
+    Row positions sorted by a numeric column; a range is one slice of them.
+    Missing values sort last and never satisfy a bound.
+    """
+
+    def __init__(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.order = np.argsort(values, kind="stable")
+        self.sorted = values[self.order]
+        self.n_rows = len(values)
+
+    def between(self, low, high):
+        start = 0 if low is None else np.searchsorted(self.sorted, low, side="left")
+        stop = np.searchsorted(self.sorted, np.inf if high is None else high, side="right")
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[self.order[start:stop]] = True
+        return mask
+
+
+class FilterIndex:
+    """
+    Precomputed indexes for restricting recommendations to a subset of
+    destinations: posting lists per country, state and tag value, and
+    sorted row orders per trait and rating. A filter becomes one boolean
+    mask over the rows, built from index slices, which the rankers apply to
+    the scores before top-N selection.
+    """
+
+    def __init__(self, df):
+        n_rows = len(df)
+        rows = np.arange(n_rows)
+        self.n_rows = n_rows
+        self.categories = {
+            field: _Postings([_normalize(v) for v in df[field]], rows, n_rows)
+            for field in CATEGORY_FIELDS
+        }
+        tag_rows, tag_values = [], []
+        for row, tags in enumerate(df["tags"]):
+            if isinstance(tags, (list, tuple, np.ndarray)):
+                for tag in {_normalize(t) for t in tags} - {""}:
+                    tag_rows.append(row)
+                    tag_values.append(tag)
+        self.tags = _Postings(tag_values, tag_rows, n_rows)
+        self.ranges = {
+            field: _SortedColumn(pd.to_numeric(df[field], errors="coerce") if field in df else np.full(n_rows, np.nan))
+            for field in RANGE_FIELDS
+        }
+
+    def mask(self, filters):
+        """
+        Boolean mask of the destinations passing every filter of a
+        parse_filters() dict, or None when there is no filter.
+        """
+        if not filters:
+            return None
+        allowed = np.ones(self.n_rows, dtype=bool)
+        for field, values in filters.items():
+            if field in self.categories:
+                allowed &= self.categories[field].any_of(values)
+            elif field == "tags_any":
+                allowed &= self.tags.any_of(values)
+            elif field == "tags_all":
+                allowed &= self.tags.all_of(values)
+            else:
+                allowed &= self.ranges[field].between(*values)
+        return allowed
+
+    def stats(self):
+        return {
+            "countries": len(self.categories["country"].codes),
+            "states": len(self.categories["state"].codes),
+            "tags": len(self.tags.codes),
+        }
@@ -0,0 +1,90 @@
+import os
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+from app.search_index import MAX_GRAM, SUGGEST_FIELDS
+
+# Minimum WRatio (0-100) for a fuzzy hit
+FUZZY_CUTOFF = float(os.environ.get("FUZZY_CUTOFF", 85))
+# At most this many blocked candidates are scored per query
+CANDIDATE_LIMIT = 256
+# Candidates must share at least this fraction of the query's trigrams
+MIN_SHARED_GRAMS = 0.3
+# rapidfuzz worker threads for cdist (-1 = all cores)
+FUZZY_WORKERS = int(os.environ.get("FUZZY_WORKERS", -1))
+
+
+class FuzzyIndex:
+    """
+    Typo-tolerant lookup over the distinct strings of a SubstringIndex.
+    Candidates are blocked by shared trigrams (reusing the substring index
+    postings), then scored in one rapidfuzz.process.cdist batch.
+    """
+
+    def __init__(self, search_index):
+        self.search_index = search_index
+
+    def candidates(self, query):
+        grams = {query[j:j + MAX_GRAM] for j in range(len(query) - MAX_GRAM + 1)}
+        lists = [self.search_index.postings(gram) for gram in grams]
+        lists = [ids for ids in lists if len(ids)]
+        if not lists:
+            return np.empty(0, dtype=np.int32)
+
+        ids, shared = np.unique(np.concatenate(lists), return_counts=True)
+        keep = shared >= max(1, int(np.ceil(len(grams) * MIN_SHARED_GRAMS)))
+        ids, shared = ids[keep], shared[keep]
+        if len(ids) > CANDIDATE_LIMIT:
+            best = np.argpartition(-shared, CANDIDATE_LIMIT - 1)[:CANDIDATE_LIMIT]
+            ids = ids[best]
+        return ids
+
+    def match(self, query, score_cutoff=FUZZY_CUTOFF):
+        """
+        Returns (string_ids, scores) of strings scoring at least score_cutoff
+        against query, best first.
+        """
+        query = query.lower().strip()
+        if len(query) < MAX_GRAM:
+            return np.empty(0, dtype=np.int32), np.empty(0)
+
+        ids = self.candidates(query)
+        if not len(ids):
+            return ids, np.empty(0)
+        strings = self.search_index.strings
+        scores = process.cdist(
+            [query], [strings[i] for i in ids],
+            scorer=fuzz.WRatio, score_cutoff=score_cutoff, workers=FUZZY_WORKERS,
+        )[0]
+        hit = scores > 0
+        ids, scores = ids[hit], scores[hit]
+        order = np.lexsort((ids, -scores))
+        return ids[order], scores[order]
+
+    def search(self, query, fields=None):
+        """
+        Rows matching the best-scoring fuzzy string(s) for query, in row order.
+        """
+        ids, scores = self.match(query)
+        if not len(ids):
+            return ids
+        return self.search_index.rows(ids[scores == scores[0]], fields)
+
+    def suggest(self, query, limit=10):
+        """
+        Distinct labels for rows whose name or city fuzzily matches query,
+        ordered by score.
+        """
+        ids, _ = self.match(query)
+        suggestions = []
+        seen = set()
+        for string_id in ids:
+            for row in self.search_index.rows([string_id], SUGGEST_FIELDS):
+                label = self.search_index.labels[row]
+                if label not in seen:
+                    seen.add(label)
+                    suggestions.append(label)
+                    if len(suggestions) == limit:
+                        return suggestions
+        return suggestions
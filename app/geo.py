@@ -0,0 +1,105 @@
+import os
+
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import BallTree
+
+from app.filters import number_param
+
+EARTH_RADIUS_KM = 6371.0088
+# Weight of proximity (vs. hybrid similarity) in "similar within R km" rankings
+DISTANCE_WEIGHT = float(os.environ.get("GEO_DISTANCE_WEIGHT", 0.3))
+# At most this many matched destinations are used as centers of a query's radius
+GEO_MAX_CENTERS = int(os.environ.get("GEO_MAX_CENTERS", 64))
+
+
+def parse_geo(params):
+    """
+    Reads the geo parameters of a request:
+        radius_km: search radius (required for any geo query)
+        lat, lon: center in degrees; without them the radius is drawn
+            around the destinations the query matched
+        distance_weight: share of proximity in blended (hybrid) scores
+    Args:
+        params: request.args, or a batch item dict
+    Returns:
+        canonical dict (usable as a cache key part), or None when the
+        request sets no radius
+    """
+    radius = number_param(params, "radius_km")
+    lat, lon = number_param(params, "lat"), number_param(params, "lon")
+    weight = number_param(params, "distance_weight")
+    if radius is None:
+        if lat is not None or lon is not None:
+            raise ValueError("lat/lon need radius_km")
+        return None
+    if not radius > 0:
+        raise ValueError("radius_km must be positive")
+    if (lat is None) != (lon is None):
+        raise ValueError("lat and lon must be given together")
+    if lat is not None and not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError("lat must be within [-90, 90] and lon within [-180, 180]")
+    weight = DISTANCE_WEIGHT if weight is None else weight
+    if not 0 <= weight <= 1:
+        raise ValueError("distance_weight must be within [0, 1]")
+    return {"radius_km": radius, "lat": lat, "lon": lon, "distance_weight": weight}
+
+
+def _degrees(df, column):
+    if column not in df:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=np.float64)
+
+
+class GeoIndex:
+    """
+    Spatial index over the destinations with coordinates: a BallTree with
+    the haversine metric, so a radius query costs O(log N + k) for k hits
+    instead of a pass over every row.
+    """
+
+    def __init__(self, df):
+        lat, lon = _degrees(df, "latitude"), _degrees(df, "longitude")
+        valid = (np.abs(lat) <= 90) & (np.abs(lon) <= 180)
+        # Per row [lat, lon] in radians, NaN where unknown
+        self.points = np.radians(np.column_stack([np.where(valid, lat, np.nan), np.where(valid, lon, np.nan)]))
+        # Tree position -> row position
+        self.rows = np.flatnonzero(valid)
+        self.tree = BallTree(self.points[self.rows], metric="haversine") if len(self.rows) else None
+
+    def centers(self, positions, limit=GEO_MAX_CENTERS):
+        """
+        Radian coordinates of the first `limit` given rows that have them.
+        """
+        points = self.points[np.asarray(positions, dtype=np.intp)]
+        return points[~np.isnan(points[:, 0])][:limit]
+
+    def within(self, centers, radius_km):
+        """
+        Rows within radius_km of any center (radian [lat, lon] pairs).
+        Returns:
+            (row positions, distances in km to the nearest center), nearest
+            first, ties by position
+        """
+        centers = np.atleast_2d(np.asarray(centers, dtype=np.float64))
+        if self.tree is None or not len(centers):
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        hits, distances = self.tree.query_radius(centers, r=radius_km / EARTH_RADIUS_KM, return_distance=True)
+        rows = self.rows[np.concatenate(hits)]
+        distances = np.concatenate(distances) * EARTH_RADIUS_KM
+        if len(centers) > 1:
+            # Keep each row once, at its distance to the nearest center
+            order = np.lexsort((distances, rows))
+            rows, distances = rows[order], distances[order]
+            first = np.concatenate(([True], rows[1:] != rows[:-1]))
+            rows, distances = rows[first], distances[first]
+        order = np.lexsort((rows, distances))
+        return rows[order], distances[order]
+
+    def stats(self):
+        return {"rows": len(self.rows)}
+
+
+def point(lat, lon):
+    # A center in the radian [lat, lon] form GeoIndex.within takes
+    return np.radians([[lat, lon]])
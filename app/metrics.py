@@ -0,0 +1,189 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+
+# "0" turns every timer and counter into a no-op and disables /metrics
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+# Fraction of requests written to the structured request log
+REQUEST_LOG_SAMPLE_RATE = float(os.environ.get("REQUEST_LOG_SAMPLE_RATE", 0.01))
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LOAD_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+SIZE_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 5000, 10000, 100000)
+
+request_log = logging.getLogger("app.requests")
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _label_text(self, labels, extra=()):
+        pairs = list(zip(self.labelnames, labels)) + list(extra)
+        if not pairs:
+            return ""
+        escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+        return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.extend(self._render_value(labels, value))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def _render_value(self, labels, value):
+        return [f"{self.name}{self._label_text(labels)} {value}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                # Per-bucket (non-cumulative) counts, +Inf last, then the sum
+                state = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[bisect_left(self.buckets, value)] += 1
+            state[-1] += value
+
+    def _render_value(self, labels, state):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + ("+Inf",), state[:-1]):
+            cumulative += count
+            lines.append(f"{self.name}_bucket{self._label_text(labels, [('le', bound)])} {cumulative}")
+        lines.append(f"{self.name}_sum{self._label_text(labels)} {state[-1]}")
+        lines.append(f"{self.name}_count{self._label_text(labels)} {cumulative}")
+        return lines
+
+
+# -----------------------------
+# Metrics
+# -----------------------------
+REQUEST_SECONDS = Histogram("recommender_request_seconds", "Request latency per endpoint.", ("endpoint",))
+STAGE_SECONDS = Histogram(
+    "recommender_stage_seconds",
+    "Latency of one stage (match, filter, geo, score, top_n, materialize, serialize) of a request.",
+    ("endpoint", "stage"),
+)
+MATCH_SET_SIZE = Histogram(
+    "recommender_match_set_size", "Destinations matched by a query.", ("endpoint",), SIZE_BUCKETS
+)
+REQUESTS = Counter("recommender_requests_total", "Requests per endpoint and status.", ("endpoint", "status"))
+ERRORS = Counter("recommender_errors_total", "Failed requests (status >= 400) per endpoint.", ("endpoint", "status"))
+MODEL_LOAD_SECONDS = Histogram(
+    "recommender_model_load_seconds", "Time to load, build or refresh the model.", ("source",), LOAD_BUCKETS
+)
+
+REGISTRY = [REQUEST_SECONDS, STAGE_SECONDS, MATCH_SET_SIZE, REQUESTS, ERRORS, MODEL_LOAD_SECONDS]
+
+# Endpoint of the request being served by this thread (labels stage timings)
+_context = threading.local()
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def current_endpoint():
+    return getattr(_context, "endpoint", "none")
+
+def bind_endpoint(endpoint):
+    _context.endpoint = endpoint
+
+def stage(name):
+    """
+    Context manager timing one stage of the current request:
+        with stage("score"): ...
+    A shared no-op when metrics are disabled.
+    """
+    if not METRICS_ENABLED:
+        return _NULL_TIMER
+    return _Timer(STAGE_SECONDS, (current_endpoint(), name))
+
+def observe_model_load(source, seconds):
+    # source: "artifacts", "database", "file" or "refresh"
+    if METRICS_ENABLED:
+        MODEL_LOAD_SECONDS.observe(seconds, source)
+
+def observe_match_set(size):
+    if METRICS_ENABLED:
+        MATCH_SET_SIZE.observe(size, current_endpoint())
+
+def observe_request(endpoint, status, seconds):
+    if not METRICS_ENABLED:
+        return
+    REQUEST_SECONDS.observe(seconds, endpoint)
+    REQUESTS.inc(endpoint, status)
+    if status >= 400:
+        ERRORS.inc(endpoint, status)
+
+def render_metrics():
+    """
+    All metrics in the Prometheus text exposition format (version 0.0.4).
+    Values are per process; with several gunicorn workers each one reports its own.
+    """
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+def log_sampled(event, **fields):
+    """
+    Writes one JSON line to the "app.requests" logger for a
+    REQUEST_LOG_SAMPLE_RATE fraction of calls.
+    """
+    if REQUEST_LOG_SAMPLE_RATE <= 0 or random.random() >= REQUEST_LOG_SAMPLE_RATE:
+        return
+    if request_log.isEnabledFor(logging.INFO):
+        request_log.info(json.dumps({"event": event, **fields}, default=str))
@@ -0,0 +1,168 @@
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import MinMaxScaler
+from DB.db_setup import connection
+from app.filters import FilterIndex
+from app.fuzzy_index import FuzzyIndex
+from app.geo import GeoIndex
+from app.neighbors import DEFAULT_K, NeighborIndex
+from app.records import RecordStore, render_records
+from app.search_index import SubstringIndex
+from app.similarity_cache import LazySimilarity
+from app.text_search import TextSearchIndex
+from app.vibe import VibeIndex
+
+# "neighbors": precomputed top-K similarities, "lazy": rows computed on demand + LRU cache
+SIMILARITY_MODE = os.environ.get("SIMILARITY_MODE", "neighbors")
+# Number of text/trait neighbors kept per destination (higher = better recall, more memory)
+NEIGHBOR_K = int(os.environ.get("NEIGHBOR_K", DEFAULT_K))
+# Byte budget of each lazy similarity row cache
+SIMILARITY_CACHE_MB = int(os.environ.get("SIMILARITY_CACHE_MB", 64))
+# Pickled destinations DataFrame used instead of PostgreSQL (offline runs, benchmarks)
+DESTINATIONS_FILE = os.environ.get("DESTINATIONS_FILE")
+
+TRAIT_COLS = ["adventure", "relax", "nature", "culture", "luxury"]
+SERVED_COLS = ["rating", "latitude", "longitude"]
+
+DESTINATIONS_QUERY = """
+    SELECT id, name, city, state, country, description, tags,
+        adventure, relax, nature, culture, luxury, rating, latitude, longitude
+    FROM destinations
+"""
+
+# Per-row content checksum, used to detect changed rows without refetching them
+CHECKSUM_QUERY = """
+    SELECT id, md5(ROW(name, city, state, country, description, tags,
+        adventure, relax, nature, culture, luxury, rating, latitude, longitude)::text)
+    FROM destinations
+"""
+
+
+class Model:
+    """
+    Everything the recommender needs to serve requests, built together so it
+    can be persisted, loaded and swapped as one unit.
+    """
+
+    def __init__(self, df, tfidf, tfidf_matrix, scaler, traits_matrix,
+                 text_similarity, trait_similarity, version, checksums=None, records=None, text_search=None):
+        self.df = df
+        self.tfidf = tfidf
+        self.tfidf_matrix = tfidf_matrix
+        self.scaler = scaler
+        self.traits_matrix = traits_matrix
+        self.text_similarity = text_similarity
+        self.trait_similarity = trait_similarity
+        self.version = version
+        self.vibe_index = VibeIndex(traits_matrix)
+        self.search_index = SubstringIndex(df)
+        self.fuzzy_index = FuzzyIndex(self.search_index)
+        self.filter_index = FilterIndex(df)
+        self.geo_index = GeoIndex(df)
+        self.text_search = text_search if text_search is not None else TextSearchIndex(tfidf, tfidf_matrix)
+        # Fragments (list of bytes) or an already packed RecordStore
+        if not isinstance(records, RecordStore):
+            records = RecordStore(records if records is not None else render_records(df))
+        self.records = records
+        # {id: md5} of the rows this model was built from (None if unknown)
+        self.checksums = checksums
+        # Version directory when loaded from artifacts
+        self.artifact_path = None
+
+    def freeze(self):
+        """
+        Marks the model's numpy buffers read-only. Called before forking
+        workers: the arrays are shared copy-on-write, and a worker writing to
+        one would both corrupt its view of the model and copy the pages.
+        """
+        holders = [self, self.text_similarity, self.trait_similarity, self.vibe_index, self.records]
+        filters = self.filter_index
+        holders += [filters.tags, *filters.categories.values(), *filters.ranges.values(), self.geo_index,
+                self.text_search]
+        for holder in holders:
+            for value in vars(holder).values():
+                arrays = [value.data, value.indices, value.indptr] if sparse.isspmatrix_csr(value) else [value]
+                for array in arrays:
+                    if isinstance(array, np.ndarray):
+                        array.flags.writeable = False
+        return self
+
+
+# -----------------------------
+# Load data from PostgreSQL
+# -----------------------------
+def load_destinations():
+    if DESTINATIONS_FILE:
+        return pd.read_pickle(DESTINATIONS_FILE)
+    with connection() as conn:
+        return pd.read_sql(DESTINATIONS_QUERY, conn)
+
+def fetch_checksums(conn):
+    cursor = conn.cursor()
+    cursor.execute(CHECKSUM_QUERY)
+    checksums = dict(cursor.fetchall())
+    cursor.close()
+    return checksums
+
+# -----------------------------
+# Preprocess text
+# -----------------------------
+def prepare_destinations(df):
+    # The served numbers as float64 whatever the column type: psycopg2 returns NUMERIC as Decimal.
+    # Not cast in SQL, where real::double precision would turn 4.3 into 4.300000190734863
+    for column in SERVED_COLS:
+        if column in df:
+            df[column] = pd.to_numeric(df[column], errors="coerce").astype("float64")
+    df["tags_str"] = df["tags"].apply(lambda x: " ".join(x) if isinstance(x, list) else str(x))
+    df["text"] = df["description"].fillna("") + " " + df["tags_str"].fillna("")
+    df["text"] = df["text"].str.lower()
+    return df
+
+def content_version(df):
+    """
+    Short hash of the columns the model is fitted on; changes whenever the
+    catalog content does.
+    """
+    digest = hashlib.sha1()
+    digest.update(pd.util.hash_pandas_object(df[["id", "text"]], index=False).values.tobytes())
+    digest.update(df[TRAIT_COLS].fillna(0).to_numpy(dtype="float64").tobytes())
+    for column in SERVED_COLS:
+        # Served and filtered on, though not fitted
+        if column in df:
+            digest.update(pd.to_numeric(df[column]).to_numpy(dtype="float64").tobytes())
+    return digest.hexdigest()[:12]
+
+def build_similarity(matrix, mode=None, k=None, cache_mb=None):
+    mode = mode or SIMILARITY_MODE
+    if mode == "lazy":
+        return LazySimilarity(matrix, (cache_mb or SIMILARITY_CACHE_MB) * 1024 * 1024)
+    if mode == "neighbors":
+        return NeighborIndex(matrix, k or NEIGHBOR_K)
+    raise ValueError(f"Unknown SIMILARITY_MODE '{mode}'")
+
+def build_model(df, mode=None, k=None, checksums=None):
+    """
+    Fits TF-IDF and the trait scaler on the destinations DataFrame and builds
+    the similarity backends.
+    """
+    df = prepare_destinations(df)
+
+    # Text similarity (TF-IDF)
+    tfidf = TfidfVectorizer(stop_words="english")
+    tfidf_matrix = tfidf.fit_transform(df["text"])
+
+    # Trait similarity (cosine)
+    scaler = MinMaxScaler()
+    traits_matrix = scaler.fit_transform(df[TRAIT_COLS].fillna(0))
+
+    return Model(
+        df, tfidf, tfidf_matrix, scaler, traits_matrix,
+        build_similarity(tfidf_matrix, mode, k),
+        build_similarity(traits_matrix, mode, k),
+        content_version(df),
+        checksums,
+    )
@@ -0,0 +1,160 @@
+import numpy as np
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+DEFAULT_K = 50
+BLOCK_SIZE = 512
+
+
+def top_k_rows(normed, rows, k, block_size=BLOCK_SIZE):
+    """
+    Top-K cosine neighbors of the given rows against all rows of an
+    L2-normalized matrix, scored one block of rows at a time.
+    Returns:
+        csr_matrix (len(rows) x N, float32)
+    """
+    n = normed.shape[0]
+    k = max(1, min(k, n))
+    rows = np.asarray(rows, dtype=np.intp)
+
+    indices = np.empty((len(rows), k), dtype=np.int32)
+    scores = np.empty((len(rows), k), dtype=np.float32)
+    for start in range(0, len(rows), block_size):
+        stop = min(start + block_size, len(rows))
+        block = normed[rows[start:stop]] @ normed.T
+        if sparse.issparse(block):
+            block = block.toarray()
+        block = np.asarray(block, dtype=np.float32)
+        top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        indices[start:stop] = top
+        scores[start:stop] = np.take_along_axis(block, top, axis=1)
+
+    indptr = np.arange(0, len(rows) * k + 1, k, dtype=np.int64)
+    index = sparse.csr_matrix((scores.ravel(), indices.ravel(), indptr), shape=(len(rows), n))
+    index.eliminate_zeros()
+    index.sort_indices()
+    return index
+
+
+def build_neighbor_index(matrix, k=DEFAULT_K, block_size=BLOCK_SIZE):
+    """
+    Builds a sparse top-K cosine similarity index over the rows of a matrix.
+    Similarities are computed one block of rows at a time, so peak memory is
+    block_size x N instead of N x N.
+    Args:
+        matrix: dense array or scipy sparse matrix, one row per destination
+        k: number of neighbors kept per row (the row itself included)
+        block_size: number of rows scored per block
+    Returns:
+        csr_matrix (N x N, float32) holding only the top-K scores of each row
+    """
+    normed = normalize(matrix)
+    return top_k_rows(normed, np.arange(normed.shape[0]), k, block_size)
+
+
+def refresh_neighbor_index(neighbors, matrix, unchanged, k, block_size=BLOCK_SIZE):
+    """
+    Updates a neighbor matrix after rows were changed, added or deleted,
+    recomputing only the lists that can differ.
+    Args:
+        neighbors: previous N_old x N_old neighbor matrix
+        matrix: new feature matrix; its first len(unchanged) rows are the
+            unchanged old rows (in that order), the rest are changed/new rows
+        unchanged: old positions of the unchanged rows
+        k: neighbors kept per row
+    Returns:
+        csr_matrix (N x N, float32)
+    """
+    normed = normalize(matrix)
+    n = normed.shape[0]
+    n_kept = len(unchanged)
+    unchanged = np.asarray(unchanged, dtype=np.intp)
+
+    old_rows = neighbors[unchanged]
+    kept = old_rows[:, unchanged].tocsr()
+    # Lists that pointed at a changed or deleted row need a replacement neighbor
+    lost = old_rows.getnnz(axis=1) != kept.getnnz(axis=1)
+
+    # Lists whose K-th best score is now beaten by a changed/new row
+    counts = np.diff(kept.indptr)
+    kth = np.zeros(n_kept, dtype=np.float32)
+    full = counts >= min(k, n)
+    if full.any():
+        # Per-row minima: reduceat over every non-empty row's start, so each segment is that row alone
+        nonempty = counts > 0
+        mins = np.zeros(n_kept, dtype=np.float32)
+        mins[nonempty] = np.minimum.reduceat(kept.data, kept.indptr[:-1][nonempty])
+        kth[full] = mins[full]
+    beaten = np.zeros(n_kept, dtype=bool)
+    if n > n_kept and n_kept:
+        fresh = normed[n_kept:]
+        for start in range(0, n_kept, block_size):
+            stop = min(start + block_size, n_kept)
+            block = normed[start:stop] @ fresh.T
+            if sparse.issparse(block):
+                block = block.toarray()
+            beaten[start:stop] = np.asarray(block).max(axis=1) > kth[start:stop]
+
+    affected = np.concatenate([np.flatnonzero(lost | beaten), np.arange(n_kept, n)])
+    recomputed = top_k_rows(normed, affected, k, block_size)
+
+    base = sparse.vstack([
+        sparse.csr_matrix((kept.data, kept.indices, kept.indptr), shape=(n_kept, n)),
+        sparse.csr_matrix((n - n_kept, n), dtype=np.float32),
+    ]).tocsr()
+    keep_mask = np.ones(n, dtype=np.float32)
+    keep_mask[affected] = 0
+    placement = sparse.csr_matrix(
+        (np.ones(len(affected), dtype=np.float32), (affected, np.arange(len(affected)))),
+        shape=(n, len(affected)),
+    )
+    index = (sparse.diags(keep_mask) @ base + placement @ recomputed).tocsr().astype(np.float32)
+    index.eliminate_zeros()
+    index.sort_indices()
+    return index
+
+
+class NeighborIndex:
+    """
+    Precomputed top-K similarity backend.
+    """
+
+    def __init__(self, matrix, k=DEFAULT_K, block_size=BLOCK_SIZE):
+        self.k = k
+        self.matrix = build_neighbor_index(matrix, k, block_size)
+
+    @classmethod
+    def from_matrix(cls, neighbor_matrix, k=None):
+        """
+        Wraps an already built neighbor matrix (e.g. one loaded from artifacts).
+        """
+        index = cls.__new__(cls)
+        index.k = k or int(np.diff(neighbor_matrix.indptr).max(initial=DEFAULT_K))
+        index.matrix = neighbor_matrix
+        return index
+
+    def refreshed(self, matrix, unchanged):
+        """
+        New index for an updated feature matrix (see refresh_neighbor_index).
+        """
+        return NeighborIndex.from_matrix(refresh_neighbor_index(self.matrix, matrix, unchanged, self.k), self.k)
+
+    def scores(self, indexes):
+        """
+        Sums the neighbor rows of the given destinations into one dense score vector.
+        Destinations outside a row's top-K contribute 0 for that row.
+        """
+        if len(indexes) == 0:
+            return np.zeros(self.matrix.shape[1])
+        return np.asarray(self.matrix[indexes].sum(axis=0), dtype=np.float64).ravel()
+
+    def batch_scores(self, selector):
+        """
+        Scores many match sets at once: selector is a Q x N sparse matrix of
+        per-query weights over destinations; returns the dense Q x N product
+        with the neighbor matrix.
+        """
+        return (selector @ self.matrix).toarray().astype(np.float64)
+
+    def stats(self):
+        return {"mode": "neighbors", "nnz": int(self.matrix.nnz)}
@@ -1,114 +1,444 @@
+import json
+import os
+import time
+import numpy as np
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.preprocessing import MinMaxScaler
-from sklearn.metrics.pairwise import cosine_similarity
-from DB.db_setup import get_connection
+from scipy import sparse
+from app.artifacts import load_artifacts
+from app.filters import parse_filters
+from app.geo import parse_geo, point
+from app.metrics import observe_match_set, observe_model_load, stage
+from app.model import DESTINATIONS_FILE, build_model, fetch_checksums, load_destinations
+from app.records import join_records, records_array
+from app.refresh import MODEL_REFRESH_INTERVAL, ModelRefresher
+from app.scoring import top_n_indices
+from app.text_search import TEXT_MATCH_LIMIT
+from DB.db_setup import connection
 
-# -----------------------------
-# Load data from PostgreSQL
-# -----------------------------
-conn = get_connection()
-query = """
-    SELECT id, name, city, state, country, description, tags,
-        adventure, relax, nature, culture, luxury
-    FROM destinations
-"""
-df = pd.read_sql(query, conn)
-conn.close()
+# Artifact root (or version directory) written by `python -m app.artifacts build`
+MODEL_ARTIFACT_DIR = os.environ.get("MODEL_ARTIFACT_DIR")
 
 # -----------------------------
-# Preprocess text
+# Load the model: memory-mapped artifacts if configured, otherwise fit from
+# PostgreSQL (or from DESTINATIONS_FILE when running offline)
 # -----------------------------
-df["tags_str"] = df["tags"].apply(lambda x: " ".join(x) if isinstance(x, list) else str(x))
-df["text"] = df["description"].fillna("") + " " + df["tags_str"].fillna("")
-df["text"] = df["text"].str.lower()
+def load_model():
+    started = time.perf_counter()
+    if MODEL_ARTIFACT_DIR:
+        loaded = load_artifacts(MODEL_ARTIFACT_DIR)
+        observe_model_load("artifacts", time.perf_counter() - started)
+        return loaded
+    if DESTINATIONS_FILE:
+        loaded = build_model(load_destinations())
+        observe_model_load("file", time.perf_counter() - started)
+        return loaded
+    with connection() as conn:
+        checksums = fetch_checksums(conn)
+    loaded = build_model(load_destinations(), checksums=checksums)
+    observe_model_load("database", time.perf_counter() - started)
+    return loaded
 
-# -----------------------------
-# Text similarity (TF-IDF)
-# -----------------------------
-tfidf = TfidfVectorizer(stop_words="english")
-tfidf_matrix = tfidf.fit_transform(df["text"])
-cosine_sim = cosine_similarity(tfidf_matrix)
+# The served model. Replaced as a whole by swap_model(); readers take one
+# reference per request (current_model()) so they never mix two versions.
+model = load_model()
 
-# -----------------------------
-# Trait similarity (cosine)
-# -----------------------------
-trait_cols = ["adventure", "relax", "nature", "culture", "luxury"]
-scaler = MinMaxScaler()
-traits_matrix = scaler.fit_transform(df[trait_cols].fillna(0))
-trait_sim = cosine_similarity(traits_matrix)
+def current_model():
+    return model
+
+def swap_model(new_model):
+    global model
+    model = new_model
+
+def start_refresher(interval=MODEL_REFRESH_INTERVAL):
+    """
+    Starts the background refresher that hot-swaps the model when the
+    destinations table (or the artifact CURRENT pointer) changes.
+    """
+    refresher = ModelRefresher(current_model, swap_model, interval, MODEL_ARTIFACT_DIR)
+    refresher.start()
+    return refresher
+
+def __getattr__(name):
+    # Backwards-compatible module attributes (df, tfidf_matrix, ...) that
+    # always reflect the current model
+    if name in ("df", "tfidf", "tfidf_matrix", "scaler", "traits_matrix",
+                "text_similarity", "trait_similarity"):
+        return getattr(model, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # -----------------------------
 # Helper function to find all matching destinations
 # -----------------------------
-def find_all_destination_matches(query):
+# "auto": name/city/state/country match, free-text fallback; "name": no fallback;
+# "text": free-text retrieval only (ranked by TF-IDF similarity to the query)
+SEARCH_MODES = ("auto", "name", "text")
+
+def match_positions(query, fuzzy=False, snapshot=None, text=False):
+    """
+    Like find_all_destination_matches, but returns the row positions as an array.
+    """
+    m = snapshot or model
     query = query.lower()
-    matches = df[
-        df["name"].str.lower().fillna("").str.contains(query) |
-        df["city"].str.lower().fillna("").str.contains(query) |
-        df["state"].str.lower().fillna("").str.contains(query) |
-        df["country"].str.lower().fillna("").str.contains(query)
-    ]
-    if matches.empty:
+    with stage("match"):
+        matches = m.search_index.search(query)
+        if not len(matches) and fuzzy:
+            # Typo fallback: rows of the closest name/city/state/country
+            matches = m.fuzzy_index.search(query)
+        if not len(matches) and text:
+            # Free-text fallback: the destinations whose descriptions/tags fit the query best
+            matches = m.text_search.search(query, TEXT_MATCH_LIMIT)
+    observe_match_set(len(matches))
+    if not len(matches):
         raise ValueError(f"No match found for '{query}'")
-    return matches.index.tolist()
+    return matches
+
+def find_all_destination_matches(query, fuzzy=False, snapshot=None, text=False):
+    return match_positions(query, fuzzy, snapshot, text).tolist()
+
+def search_mode(search):
+    if search not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode '{search}', expected one of {', '.join(SEARCH_MODES)}")
+    return search
+
+def rank_text(query_text, top_n=5, snapshot=None, filters=None):
+    """
+    Free-text retrieval: the top_n destinations by TF-IDF cosine similarity
+    between the query and their description and tags.
+    """
+    m = snapshot or model
+    allowed = allowed_rows(m, filters)
+    with stage("top_n"):
+        results = m.text_search.search(query_text.lower(), top_n, allowed)
+    observe_match_set(len(results))
+    if not len(results) and not len(m.text_search.query_terms(query_text.lower())[0]):
+        raise ValueError(f"No match found for '{query_text}'")
+    return results
+
+def suggest_destinations(query, limit=10, fuzzy=False, snapshot=None):
+    m = snapshot or model
+    suggestions = m.search_index.suggest(query, limit)
+    if not suggestions and fuzzy:
+        suggestions = m.fuzzy_index.suggest(query, limit)
+    return suggestions
+
+# -----------------------------
+# Filters
+# -----------------------------
+def allowed_rows(m, filters):
+    """
+    Boolean mask of the rows passing a parse_filters() dict (None: all rows).
+    """
+    if not filters:
+        return None
+    with stage("filter"):
+        return m.filter_index.mask(filters)
+
+def top_similar(scores, top_n, allowed=None):
+    """
+    Top-N of a query or traits ranking. The best hit is the query
+    destination itself, so it is skipped, also when a filter excludes it.
+    """
+    if allowed is None:
+        return top_n_indices(scores, top_n + 1)[1:]
+    return top_n_indices(scores, top_n, exclude=top_n_indices(scores, 1), allowed=allowed)
 
 # -----------------------------
 # Recommender functions
 # -----------------------------
-def recommend_by_query(query_text, top_n=5):
-    indexes = find_all_destination_matches(query_text)
-    combined_scores = pd.Series(0, index=df.index)
-    for idx in indexes:
-        combined_scores += cosine_sim[idx]
-    combined_scores = combined_scores.sort_values(ascending=False)
-    return df.iloc[combined_scores.index[1:top_n+1]]
-
-def recommend_hybrid(query_text, top_n=5, alpha=0.7):
+def rank_by_query(query_text, top_n=5, fuzzy=True, snapshot=None, filters=None, search="auto"):
+    m = snapshot or model
+    if search_mode(search) == "text":
+        return rank_text(query_text, top_n, m, filters)
+    indexes = find_all_destination_matches(query_text, fuzzy, m, search == "auto")
+    allowed = allowed_rows(m, filters)
+    with stage("score"):
+        combined_scores = m.text_similarity.scores(indexes)
+    with stage("top_n"):
+        return top_similar(combined_scores, top_n, allowed)
+
+def rank_hybrid(query_text, top_n=5, alpha=0.7, fuzzy=True, snapshot=None, filters=None, geo=None,
+                search="auto"):
+    m = snapshot or model
+    if search_mode(search) == "text":
+        if geo:
+            raise ValueError("radius_km is not supported with search=text")
+        return rank_text(query_text, top_n, m, filters)
     try:
-        indexes = find_all_destination_matches(query_text)
+        indexes = find_all_destination_matches(query_text, fuzzy, m, search == "auto")
     except ValueError:
         indexes = []
+    allowed = allowed_rows(m, filters)
+
+    with stage("score"):
+        text_scores = m.text_similarity.scores(indexes)
+        trait_scores = m.trait_similarity.scores(indexes)
+        combined_scores = alpha * text_scores + (1 - alpha) * trait_scores
+
+        if indexes:
+            combined_scores /= len(indexes)
+
+    if geo:
+        with stage("geo"):
+            rows, distances = m.geo_index.within(geo_centers(m, geo, indexes), geo["radius_km"])
+        with stage("top_n"):
+            return near_hybrid(combined_scores, indexes, rows, distances, geo, top_n, allowed)
+
+    # Exact matches first, then similar recommendations (excluding the exact matches)
+    with stage("top_n"):
+        similar_indices = top_n_indices(combined_scores, top_n, exclude=indexes, allowed=allowed)
+    return np.concatenate([exact_matches(indexes, allowed), similar_indices])
+
+def exact_matches(indexes, allowed=None):
+    # The matched destinations lead hybrid results, unless filtered out
+    indexes = np.asarray(indexes, dtype=np.intp)
+    return indexes if allowed is None else indexes[allowed[indexes]]
+
+def rank_by_traits(query_text, top_n=5, fuzzy=True, snapshot=None, filters=None, search="auto"):
+    m = snapshot or model
+    if search_mode(search) == "text":
+        return rank_text(query_text, top_n, m, filters)
+    indexes = find_all_destination_matches(query_text, fuzzy, m, search == "auto")
+    allowed = allowed_rows(m, filters)
+    with stage("score"):
+        combined_scores = m.trait_similarity.scores(indexes)
+    with stage("top_n"):
+        return top_similar(combined_scores, top_n, allowed)
+
+# -----------------------------
+# Geo
+# -----------------------------
+def geo_centers(m, geo, indexes):
+    """
+    Radian centers of a geo query: its lat/lon, else the matched
+    destinations that have coordinates.
+    """
+    if geo["lat"] is not None:
+        return point(geo["lat"], geo["lon"])
+    centers = m.geo_index.centers(indexes)
+    if not len(centers):
+        raise ValueError("No coordinates to search around, pass lat and lon")
+    return centers
+
+def rank_near(query_text, geo, top_n=5, fuzzy=True, snapshot=None, filters=None):
+    """
+    Destinations within geo["radius_km"] of geo's lat/lon or, without
+    them, of the destinations query_text matches (which are left out),
+    nearest first.
+    """
+    m = snapshot or model
+    if not geo:
+        raise ValueError("Missing radius_km")
+    indexes = np.empty(0, dtype=np.intp)
+    if geo["lat"] is None:
+        if not query_text:
+            raise ValueError("Pass a query or lat and lon")
+        indexes = match_positions(query_text, fuzzy, m)
+    allowed = allowed_rows(m, filters)
+    with stage("geo"):
+        rows, _ = m.geo_index.within(geo_centers(m, geo, indexes), geo["radius_km"])
+    with stage("top_n"):
+        keep = ~np.isin(rows, indexes)
+        if allowed is not None:
+            keep &= allowed[rows]
+        return rows[keep][:top_n]
+
+def near_hybrid(scores, indexes, rows, distances, geo, top_n, allowed=None):
+    """
+    "Similar within R km" ranking of the rows a radius query returned: the
+    exact matches inside the radius first, then the other rows by
+        (1 - w) * similarity + w * (1 - distance / R)
+    where similarity is the hybrid score relative to the best one in the
+    radius and w is geo["distance_weight"].
+    """
+    indexes = np.asarray(indexes, dtype=np.intp)
+    keep = np.ones(len(rows), dtype=bool) if allowed is None else allowed[rows]
+    matched = np.isin(rows, indexes)
+    exact = indexes[np.isin(indexes, rows[keep & matched])]
+
+    candidates, distances = rows[keep & ~matched], distances[keep & ~matched]
+    similarity = scores[candidates]
+    best = similarity.max(initial=0)
+    if best > 0:
+        similarity = similarity / best
+    weight = geo["distance_weight"]
+    blended = (1 - weight) * similarity + weight * (1 - distances / geo["radius_km"])
+    similar = candidates[np.lexsort((candidates, -blended))][:top_n]
+    return np.concatenate([exact, similar])
+
+def rank_batch(items, snapshot=None):
+    """
+    Ranks many heterogeneous requests together. Each item is a dict with
+    "type" ("query", "hybrid", "traits", "vibe" or "near"), "top_n", and either
+    "query" (+ "alpha" for hybrid, "fuzzy") or "traits" (vibe), plus
+    optional filters with the parse_filters() keys, geo parameters
+    (parse_geo() keys; required for "near") and "search" (SEARCH_MODES).
+    Match sets become rows of two sparse selector matrices (text and trait
+    weights) scored in one product per backend; vibe profiles are scored in
+    one product by the vibe index; radius queries are ranked one at a time.
+    Returns, per item, row positions or the ValueError raised for it.
+    """
+    m = snapshot or model
+    n_rows = len(m.df)
+    results = [None] * len(items)
+    scored = []  # (item position, kind, matches, top_n, text weight, trait weight, allowed rows)
+    vibes = []  # (item position, user traits, top_n, allowed rows)
+
+    for i, item in enumerate(items):
+        try:
+            kind = item.get("type", "hybrid")
+            top_n = int(item.get("top_n", 5))
+            fuzzy = bool(item.get("fuzzy", True))
+            filters, geo = parse_filters(item), parse_geo(item)
+            search = search_mode(item.get("search", "auto"))
+            if kind == "near":
+                results[i] = rank_near(item.get("query"), geo, top_n, fuzzy, m, filters)
+                continue
+            if kind == "hybrid" and geo:
+                results[i] = rank_hybrid(item["query"], top_n, float(item.get("alpha", 0.7)), fuzzy, m, filters, geo,
+                                         search)
+                continue
+            if kind in ("query", "traits", "hybrid") and search == "text":
+                results[i] = rank_text(item["query"], top_n, m, filters)
+                continue
+            allowed = allowed_rows(m, filters)
+            if kind == "vibe":
+                vibes.append((i, item.get("traits") or {}, top_n, allowed))
+                continue
+            if kind in ("query", "traits"):
+                indexes = match_positions(item["query"], fuzzy, m, search == "auto")
+                text_w, trait_w = (1.0, 0.0) if kind == "query" else (0.0, 1.0)
+            elif kind == "hybrid":
+                try:
+                    indexes = match_positions(item["query"], fuzzy, m, search == "auto")
+                except ValueError:
+                    indexes = np.empty(0, dtype=np.intp)
+                alpha = float(item.get("alpha", 0.7))
+                text_w = alpha / max(len(indexes), 1)
+                trait_w = (1 - alpha) / max(len(indexes), 1)
+            else:
+                raise ValueError(f"Unknown request type '{kind}'")
+        except (KeyError, TypeError, ValueError) as e:
+            results[i] = e if isinstance(e, ValueError) else ValueError(f"Invalid request: {e}")
+            continue
+        scored.append((i, kind, indexes, top_n, text_w, trait_w, allowed))
+
+    if scored:
+        lengths = np.asarray([len(entry[2]) for entry in scored])
+        rows = np.repeat(np.arange(len(scored)), lengths)
+        cols = np.concatenate([entry[2] for entry in scored]).astype(np.intp)
+        with stage("score"):
+            scores = np.zeros((len(scored), n_rows))
+            for backend, column in ((m.text_similarity, 4), (m.trait_similarity, 5)):
+                weights = np.repeat([entry[column] for entry in scored], lengths)
+                if weights.any():
+                    selector = sparse.csr_matrix((weights, (rows, cols)), shape=(len(scored), n_rows))
+                    scores += backend.batch_scores(selector)
+        with stage("top_n"):
+            for row, (i, kind, indexes, top_n, _, _, allowed) in enumerate(scored):
+                if kind == "hybrid":
+                    similar = top_n_indices(scores[row], top_n, exclude=indexes, allowed=allowed)
+                    results[i] = np.concatenate([exact_matches(indexes, allowed), similar])
+                else:
+                    results[i] = top_similar(scores[row], top_n, allowed)
+
+    valid = []
+    for i, user_traits, top_n, allowed in vibes:
+        try:
+            scale_user_traits(m, [user_traits])
+            valid.append((i, user_traits, top_n, allowed))
+        except (TypeError, ValueError) as e:
+            results[i] = e if isinstance(e, ValueError) else ValueError(f"Invalid request: {e}")
+    if valid:
+        users = scale_user_traits(m, [user_traits for _, user_traits, _, _ in valid])
+        ranked = m.vibe_index.batch_rank(users, [top_n for _, _, top_n, _ in valid],
+                                         [allowed for _, _, _, allowed in valid])
+        for (i, _, _, _), positions in zip(valid, ranked):
+            results[i] = positions
+
+    return results
+
+def recommend_by_query(query_text, top_n=5, fuzzy=True, filters=None, search="auto"):
+    m = model
+    return m.df.iloc[rank_by_query(query_text, top_n, fuzzy, m, filters, search)]
+
+def recommend_hybrid(query_text, top_n=5, alpha=0.7, fuzzy=True, filters=None, geo=None, search="auto"):
+    m = model
+    return m.df.iloc[rank_hybrid(query_text, top_n, alpha, fuzzy, m, filters, geo, search)].reset_index(drop=True)
+
+def recommend_near(query_text, geo, top_n=5, fuzzy=True, filters=None):
+    m = model
+    return m.df.iloc[rank_near(query_text, geo, top_n, fuzzy, m, filters)]
+
+def recommend_by_traits(query_text, top_n=5, fuzzy=True, filters=None, search="auto"):
+    m = model
+    return m.df.iloc[rank_by_traits(query_text, top_n, fuzzy, m, filters, search)]
+
+# -----------------------------
+# Serialization
+# -----------------------------
+def render_json(positions, snapshot=None):
+    """
+    JSON array body for the given rows, joined from the fragments rendered at
+    model load; identical to jsonify(df.iloc[positions].to_dict(orient="records")).
+    """
+    return join_records((snapshot or model).records, positions)
+
+def render_batch_json(results, snapshot=None):
+    """
+    JSON array body with one element per batch item: the records array of a
+    ranked item, or {"error": ...} for a failed one.
+    """
+    m = snapshot or model
+    parts = [
+        json.dumps({"error": str(result)}).encode() if isinstance(result, Exception)
+        else records_array(m.records, result)
+        for result in results
+    ]
+    return b"[" + b",".join(parts) + b"]\n"
+
+def batch_records(results, snapshot=None):
+    return [
+        {"error": str(result)} if isinstance(result, Exception) else records(result, snapshot)
+        for result in results
+    ]
+
+def records(positions, snapshot=None):
+    return (snapshot or model).df.iloc[positions].to_dict(orient="records")
+
+def model_version(snapshot=None):
+    return (snapshot or model).version
+
+def similarity_stats(snapshot=None):
+    m = snapshot or model
+    return {
+        "text": m.text_similarity.stats(),
+        "traits": m.trait_similarity.stats(),
+        "vibe": m.vibe_index.stats(),
+        "filters": m.filter_index.stats(),
+        "geo": m.geo_index.stats(),
+        "text_search": m.text_search.stats(),
+    }
+
+TRAIT_NAMES = ["adventure", "relax", "nature", "culture", "luxury"]
+
+def scale_user_traits(m, users):
+    """
+    Validates trait dicts and scales them with the model's trait scaler.
+    Returns:
+        array (len(users) x 5)
+    """
+    for user_traits in users:
+        for trait in TRAIT_NAMES:
+            if trait not in user_traits:
+                raise ValueError(f"Missing trait: {trait}")
+    user_vectors = pd.DataFrame(list(users))[TRAIT_NAMES].astype(float)
+    return m.scaler.transform(user_vectors)
+
+def rank_by_vibe(user_traits, top_n=5, snapshot=None, filters=None):
+    m = snapshot or model
+    user_scaled = scale_user_traits(m, [user_traits])
+    return m.vibe_index.rank(user_scaled[0], top_n, allowed_rows(m, filters))
 
-    combined_scores = pd.Series(0.0, index=df.index)
-    for idx in indexes:
-        text_scores = cosine_sim[idx]
-        trait_scores = trait_sim[idx]
-        final_scores = alpha * text_scores + (1 - alpha) * trait_scores
-        combined_scores += final_scores
-
-    if indexes:
-        combined_scores /= len(indexes)
-
-    # Exclude exact matches from similar recommendations
-    combined_scores = combined_scores.drop(indexes, errors='ignore')
-    combined_scores = combined_scores.sort_values(ascending=False)
-    similar_indices = combined_scores.index[:top_n]
-
-    # Create the final combined DataFrame
-    exact_matches_df = df.iloc[indexes] if indexes else pd.DataFrame()
-    similar_df = df.loc[similar_indices]
-    final_results = pd.concat([exact_matches_df, similar_df])
-
-    return final_results.reset_index(drop=True)
-
-def recommend_by_traits(query_text, top_n=5):
-    indexes = find_all_destination_matches(query_text)
-    combined_scores = pd.Series(0, index=df.index)
-    for idx in indexes:
-        combined_scores += trait_sim[idx]
-    combined_scores = combined_scores.sort_values(ascending=False)
-    return df.iloc[combined_scores.index[1:top_n+1]]
-
-def recommend_by_vibe(user_traits, top_n=5):
-    required = ["adventure", "relax", "nature", "culture", "luxury"]
-    for trait in required:
-        if trait not in user_traits:
-            raise ValueError(f"Missing trait: {trait}")
-
-    user_vector = pd.DataFrame([user_traits])[required].astype(float)
-    user_scaled = scaler.transform(user_vector)
-    sim_scores = cosine_similarity(user_scaled, traits_matrix)[0]
-    sim_scores = list(enumerate(sim_scores))
-    sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)[:top_n]
-    return df.iloc[[i[0] for i in sim_scores]]
\ No newline at end of file
+def recommend_by_vibe(user_traits, top_n=5, filters=None):
+    m = model
+    return m.df.iloc[rank_by_vibe(user_traits, top_n, m, filters)]
@@ -0,0 +1,72 @@
+import json
+import mmap
+
+import numpy as np
+from flask.json.provider import DefaultJSONProvider
+
+
+def render_records(df):
+    """
+    Pre-renders every row as the JSON object Flask's default provider emits
+    for df.to_dict(orient="records") (sorted keys, ASCII-escaped, compact
+    separators; NaN stays NaN, tags lists stay arrays). Values json cannot
+    encode (Decimal, date, UUID...) go through the provider's default hook,
+    as they do in jsonify.
+    Returns:
+        list of bytes, one fragment per row position
+    """
+    return [
+        json.dumps(record, ensure_ascii=True, sort_keys=True, separators=(",", ":"),
+                   default=DefaultJSONProvider.default).encode()
+        for record in df.to_dict(orient="records")
+    ]
+
+class RecordStore:
+    """
+    Row fragments packed into one bytes buffer plus an offsets array.
+    Indexing returns a fresh bytes copy of the fragment, so serving a
+    response never touches per-row Python objects. Workers forked from a
+    preloading master (see gunicorn.conf.py) then keep reading the master's
+    pages instead of copying them through refcount updates.
+    """
+
+    def __init__(self, fragments):
+        self.buffer = b"".join(fragments)
+        self.offsets = np.zeros(len(fragments) + 1, dtype=np.int64)
+        np.cumsum([len(fragment) for fragment in fragments], out=self.offsets[1:])
+
+    @classmethod
+    def open(cls, buffer_path, offsets_path):
+        """
+        Memory-maps a store written by save(); slicing an mmap returns bytes
+        like slicing the in-memory buffer does.
+        """
+        store = cls.__new__(cls)
+        store.offsets = np.load(offsets_path, mmap_mode="r")
+        with open(buffer_path, "rb") as f:
+            # mmap rejects empty files
+            store.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if store.offsets[-1] else b""
+        return store
+
+    def save(self, buffer_path, offsets_path):
+        with open(buffer_path, "wb") as f:
+            f.write(self.buffer)
+        np.save(offsets_path, np.asarray(self.offsets))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.buffer[self.offsets[i]:self.offsets[i + 1]]
+
+def records_array(fragments, positions):
+    """
+    JSON array of the given rows' fragments.
+    """
+    return b"[" + b",".join([fragments[i] for i in positions]) + b"]"
+
+def join_records(fragments, positions):
+    """
+    Assembles a JSON array response body from the fragments of the given rows.
+    """
+    return records_array(fragments, positions) + b"\n"
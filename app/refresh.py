@@ -0,0 +1,137 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from DB.db_setup import connection
+from app.artifacts import load_artifacts, resolve_artifact_dir
+from app.model import (
+    DESTINATIONS_QUERY, TRAIT_COLS, Model, build_model, content_version,
+    fetch_checksums, prepare_destinations
+)
+from app.metrics import observe_model_load
+from app.records import render_records
+
+# Seconds between change checks (0 disables the background refresher)
+MODEL_REFRESH_INTERVAL = int(os.environ.get("MODEL_REFRESH_INTERVAL", 0))
+# Above this fraction of changed rows, refit from scratch instead of patching
+FULL_REBUILD_RATIO = float(os.environ.get("FULL_REBUILD_RATIO", 0.2))
+
+
+def diff_checksums(old, new):
+    """
+    Returns (added, changed, deleted) destination ids between two {id: md5} maps.
+    """
+    added = [i for i in new if i not in old]
+    changed = [i for i in new if i in old and old[i] != new[i]]
+    deleted = [i for i in old if i not in new]
+    return added, changed, deleted
+
+def fetch_rows(conn, ids):
+    return pd.read_sql(DESTINATIONS_QUERY + " WHERE id = ANY(%(ids)s)", conn, params={"ids": list(ids)})
+
+def refresh_model(old, rows, deleted_ids, checksums=None):
+    """
+    Builds a new model from old plus the given changed/new rows, without
+    refitting: rows are transformed with the existing TF-IDF vocabulary and
+    trait scaler, and only neighbor lists that can differ are recomputed.
+    Unchanged rows keep their order and come first; changed/new rows follow.
+    """
+    rows = prepare_destinations(rows.reset_index(drop=True))
+    replaced = set(rows["id"]) | set(deleted_ids)
+    unchanged = np.flatnonzero(~old.df["id"].isin(replaced).to_numpy())
+
+    df = pd.concat([old.df.iloc[unchanged], rows], ignore_index=True)
+    tfidf_matrix = sparse.vstack([
+        old.tfidf_matrix[unchanged],
+        old.tfidf.transform(rows["text"]),
+    ]).tocsr()
+    traits_matrix = np.vstack([
+        np.asarray(old.traits_matrix)[unchanged],
+        old.scaler.transform(rows[TRAIT_COLS].fillna(0)),
+    ])
+    records = [old.records[i] for i in unchanged] + render_records(rows)
+
+    return Model(
+        df, old.tfidf, tfidf_matrix, old.scaler, traits_matrix,
+        old.text_similarity.refreshed(tfidf_matrix, unchanged),
+        old.trait_similarity.refreshed(traits_matrix, unchanged),
+        content_version(df),
+        checksums,
+        records,
+    )
+
+
+class ModelRefresher(threading.Thread):
+    """
+    Background thread that keeps the served model current.
+    With artifacts it reloads whenever CURRENT points at a new version;
+    otherwise it diffs per-row checksums against the destinations table and
+    patches (or, past FULL_REBUILD_RATIO, refits) the model. New models are
+    handed to publish() only once fully built.
+
+    Each gunicorn worker runs its own refresher (threads do not survive the
+    fork), so after the first change every worker holds a private copy of
+    the model instead of the master's copy-on-write pages: plan for
+    WEB_CONCURRENCY x the model size. With MODEL_ARTIFACT_DIR the workers
+    reload memory-mapped artifacts instead, whose matrices stay shared
+    through the page cache.
+    """
+
+    def __init__(self, get_model, publish, interval=MODEL_REFRESH_INTERVAL, artifact_dir=None):
+        super().__init__(name="model-refresher", daemon=True)
+        self.get_model = get_model
+        self.publish = publish
+        self.interval = interval
+        self.artifact_dir = artifact_dir
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.refresh_once()
+            except Exception as e:
+                print(f"❌ Model refresh failed: {e}")
+
+    def stop(self):
+        self._stop_event.set()
+
+    def refresh_once(self):
+        """
+        Runs one change check. Returns the published model, or None.
+        """
+        current = self.get_model()
+        started = time.time()
+        if self.artifact_dir:
+            path = resolve_artifact_dir(self.artifact_dir)
+            if path == current.artifact_path:
+                return None
+            new_model = load_artifacts(path)
+        else:
+            new_model = self._refresh_from_db(current)
+            if new_model is None:
+                return None
+
+        # Read-only like the preloaded model; a refreshed model must not be written either
+        self.publish(new_model.freeze())
+        observe_model_load("refresh", time.time() - started)
+        print(f"🔄 Model {current.version} -> {new_model.version} in {time.time() - started:.2f}s")
+        return new_model
+
+    def _refresh_from_db(self, current):
+        with connection() as conn:
+            checksums = fetch_checksums(conn)
+            if current.checksums is None:
+                # Nothing to diff against (e.g. a model loaded from DESTINATIONS_FILE):
+                # reload once, so rows changed since it was built are not missed
+                return build_model(pd.read_sql(DESTINATIONS_QUERY, conn), checksums=checksums)
+            added, changed, deleted = diff_checksums(current.checksums, checksums)
+            n_changes = len(added) + len(changed) + len(deleted)
+            if not n_changes:
+                return None
+            if n_changes > FULL_REBUILD_RATIO * len(current.df):
+                return build_model(pd.read_sql(DESTINATIONS_QUERY, conn), checksums=checksums)
+            return refresh_model(current, fetch_rows(conn, added + changed), deleted, checksums)
@@ -0,0 +1,170 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# "memory" (per-process LRU+TTL), "shared" (Redis-compatible store) or "off"
+RESPONSE_CACHE = os.environ.get("RESPONSE_CACHE", "memory")
+RESPONSE_CACHE_TTL = int(os.environ.get("RESPONSE_CACHE_TTL", 300))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", 10000))
+RESPONSE_CACHE_MAX_MB = int(os.environ.get("RESPONSE_CACHE_MAX_MB", 64))
+# redis://... for the shared backend; without it a local stand-in is used
+RESPONSE_CACHE_URL = os.environ.get("RESPONSE_CACHE_URL")
+
+
+def make_key(endpoint, version, *parts):
+    return json.dumps([endpoint, version, *parts], separators=(",", ":"))
+
+
+class _Counters:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def as_dict(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class LRUTTLCache:
+    """
+    In-process response cache bounded by entry count and total body bytes;
+    entries expire after ttl seconds. Dropped wholesale when the model
+    version changes.
+    """
+
+    def __init__(self, ttl=RESPONSE_CACHE_TTL, max_entries=RESPONSE_CACHE_MAX_ENTRIES,
+                 max_bytes=RESPONSE_CACHE_MAX_MB * 1024 * 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.version = None
+        self.counters = _Counters()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _check_version(self, version):
+        if version != self.version:
+            self._entries.clear()
+            self.current_bytes = 0
+            self.version = version
+
+    def get(self, key, version):
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._drop(key)
+                self.counters.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.counters.hits += 1
+            return entry[1]
+
+    def set(self, key, body, version):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            self._check_version(version)
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, body)
+            self.current_bytes += len(body)
+            while len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.counters.evictions += 1
+
+    def _drop(self, key):
+        _, body = self._entries.pop(key)
+        self.current_bytes -= len(body)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": "memory",
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                **self.counters.as_dict(),
+            }
+
+
+class LocalSharedStore:
+    """
+    Stand-in for a Redis client (get/set with ex=) used when no
+    RESPONSE_CACHE_URL is configured, e.g. in local development.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._data[key]
+                return None
+            return entry[1]
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ex if ex else float("inf"), value)
+
+
+class SharedCache:
+    """
+    Response cache in a store shared by all workers. The model version is
+    part of every key, so entries of an old model are never served and just
+    expire.
+    """
+
+    def __init__(self, client, ttl=RESPONSE_CACHE_TTL, max_bytes=RESPONSE_CACHE_MAX_MB * 1024 * 1024):
+        self.client = client
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.counters = _Counters()
+
+    def get(self, key, version):
+        body = self.client.get(key)
+        if body is None:
+            self.counters.misses += 1
+        else:
+            self.counters.hits += 1
+        return body
+
+    def set(self, key, body, version):
+        if len(body) <= self.max_bytes:
+            self.client.set(key, body, ex=self.ttl)
+
+    def stats(self):
+        return {"backend": "shared", "client": type(self.client).__name__, **self.counters.as_dict()}
+
+
+def build_response_cache(backend=None):
+    """
+    Returns the configured cache, or None when caching is off.
+    """
+    backend = backend or RESPONSE_CACHE
+    if backend == "off":
+        return None
+    if backend == "memory":
+        return LRUTTLCache()
+    if backend == "shared":
+        if RESPONSE_CACHE_URL:
+            import redis
+            return SharedCache(redis.Redis.from_url(RESPONSE_CACHE_URL))
+        return SharedCache(LocalSharedStore())
+    raise ValueError(f"Unknown RESPONSE_CACHE '{backend}'")
@@ -0,0 +1,48 @@
+import numpy as np
+
+
+def top_n_indices(scores, n, exclude=None, allowed=None):
+    """
+    Returns the positions of the n highest scores, best first, without
+    sorting the whole array (argpartition + sort of the n candidates).
+    The selected candidates are ordered by score, then by position.
+    Args:
+        scores: 1-D array of scores, one per destination
+        n: number of positions to return
+        exclude: optional positions that must never be returned
+        allowed: optional boolean mask; only these positions may be returned
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    if allowed is not None:
+        scores = np.where(allowed, scores, -np.inf)
+    if exclude is not None and len(exclude):
+        if allowed is None:
+            scores = scores.copy()
+        scores[np.asarray(exclude)] = -np.inf
+    n = min(n, scores.shape[0])
+    if n <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    top = np.argpartition(-scores, n - 1)[:n]
+    top = top[np.lexsort((top, -scores[top]))]
+    return top[scores[top] > -np.inf]
+
+
+def top_n_stable(scores, n, allowed=None):
+    """
+    Like top_n_indices, but equivalent to a stable descending sort: every
+    row tied with the n-th best score competes for the last slots, and ties
+    go to the lower position.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    if allowed is not None:
+        # Rank the allowed rows only; their relative order is unchanged
+        rows = np.flatnonzero(allowed)
+        return rows[top_n_stable(scores[rows], n)]
+    n = min(n, scores.shape[0])
+    if n <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    kth = scores[np.argpartition(-scores, n - 1)[n - 1]]
+    candidates = np.flatnonzero(scores >= kth)
+    return candidates[np.lexsort((candidates, -scores[candidates]))][:n]
@@ -0,0 +1,147 @@
+import re
+from bisect import bisect_left
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+SEARCH_FIELDS = ("name", "city", "state", "country")
+SUGGEST_FIELDS = ("name", "city")
+MAX_GRAM = 3
+# Above this many matched strings, rows are gathered with one vectorized mask instead of slices
+SLICE_LIMIT = 64
+
+_EMPTY = np.empty(0, dtype=np.int32)
+# Queries containing these are regexes to str.contains(); they take the slow path
+_REGEX_CHARS = re.compile(r"[.^$*+?{}\[\]\\|()]")
+
+
+class SubstringIndex:
+    """
+    Substring/prefix index over the normalized (lower-cased) name, city,
+    state and country of every destination.
+    Distinct strings are indexed by their 1..3-grams; a query is answered by
+    intersecting the posting lists of its grams and verifying the few
+    survivors, so lookups touch only candidate strings instead of every row.
+    """
+
+    def __init__(self, df, fields=SEARCH_FIELDS):
+        self.fields = fields
+        n_rows = len(df)
+        normalized = [df[field].str.lower().fillna("") for field in fields]
+        codes, uniques = pd.factorize(pd.concat(normalized, ignore_index=True))
+        uniques = list(uniques)
+        self.strings = uniques
+        n_strings = len(uniques)
+
+        # Per field: rows grouped by string id (order[starts[i]:starts[i+1]])
+        self._codes = {}
+        self._groups = {}
+        for i, field in enumerate(fields):
+            field_codes = codes[i * n_rows:(i + 1) * n_rows]
+            order = np.argsort(field_codes, kind="stable").astype(np.int32)
+            starts = np.concatenate(([0], np.cumsum(np.bincount(field_codes, minlength=n_strings))))
+            self._codes[field] = field_codes
+            self._groups[field] = (order, starts)
+
+        postings = defaultdict(list)
+        for string_id, value in enumerate(uniques):
+            grams = {value[j:j + size]
+                     for size in range(1, MAX_GRAM + 1)
+                     for j in range(len(value) - size + 1)}
+            for gram in grams:
+                postings[gram].append(string_id)
+        self._postings = {gram: np.asarray(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+        self._sorted_ids = np.asarray(sorted(range(n_strings), key=uniques.__getitem__), dtype=np.int32)
+        self._sorted_strings = [uniques[i] for i in self._sorted_ids]
+
+        self.labels = [
+            ", ".join([p for p in parts if p and isinstance(p, str)])
+            for parts in zip(df["name"], df["city"], df["state"], df["country"])
+        ]
+
+    def postings(self, gram):
+        """
+        Ids of the distinct strings containing gram (len(gram) <= MAX_GRAM).
+        """
+        return self._postings.get(gram, _EMPTY)
+
+    def matching_strings(self, query):
+        """
+        Ids of the distinct strings containing query (str.contains semantics).
+        """
+        if _REGEX_CHARS.search(query):
+            pattern = re.compile(query)
+            return np.asarray([i for i, s in enumerate(self.strings) if pattern.search(s)], dtype=np.int32)
+        if not query:
+            return np.arange(len(self.strings), dtype=np.int32)
+        if len(query) <= MAX_GRAM:
+            return self._postings.get(query, _EMPTY)
+
+        grams = {query[j:j + MAX_GRAM] for j in range(len(query) - MAX_GRAM + 1)}
+        lists = sorted((self._postings.get(gram, _EMPTY) for gram in grams), key=len)
+        candidates = lists[0]
+        for ids in lists[1:]:
+            if not len(candidates):
+                break
+            candidates = np.intersect1d(candidates, ids, assume_unique=True)
+        return np.asarray([i for i in candidates if query in self.strings[i]], dtype=np.int32)
+
+    def prefix_strings(self, query):
+        """
+        Ids of the distinct strings starting with query.
+        """
+        lo = bisect_left(self._sorted_strings, query)
+        hi = bisect_left(self._sorted_strings, query + "\U0010ffff", lo)
+        return self._sorted_ids[lo:hi]
+
+    def rows(self, string_ids, fields=None):
+        """
+        Sorted row positions whose value in any of fields is one of string_ids.
+        """
+        fields = fields or self.fields
+        if not len(string_ids):
+            return _EMPTY
+        if len(string_ids) > SLICE_LIMIT:
+            wanted = np.zeros(len(self.strings), dtype=bool)
+            wanted[string_ids] = True
+            hit = np.zeros(len(self.labels), dtype=bool)
+            for field in fields:
+                hit |= wanted[self._codes[field]]
+            return np.flatnonzero(hit)
+        parts = []
+        for field in fields:
+            order, starts = self._groups[field]
+            parts.extend(order[starts[i]:starts[i + 1]] for i in string_ids)
+        return np.unique(np.concatenate(parts))
+
+    def search(self, query, fields=None):
+        """
+        Row positions where any field contains query, in row order.
+        """
+        return self.rows(self.matching_strings(query.lower()), fields)
+
+    def suggest(self, query, limit=10):
+        """
+        Up to limit distinct "name, city, state, country" labels for rows whose
+        name or city contains query. Prefix matches rank ahead of infix ones;
+        within each group rows keep catalog order.
+        """
+        query = query.lower()
+        matched = self.rows(self.matching_strings(query), SUGGEST_FIELDS)
+        if not len(matched):
+            return []
+        prefixed = _EMPTY if _REGEX_CHARS.search(query) else self.rows(self.prefix_strings(query), SUGGEST_FIELDS)
+
+        suggestions = []
+        seen = set()
+        for row in np.concatenate([prefixed, matched]):
+            label = self.labels[row]
+            if label not in seen:
+                seen.add(label)
+                suggestions.append(label)
+                if len(suggestions) == limit:
+                    break
+        return suggestions
+
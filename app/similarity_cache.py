@@ -0,0 +1,129 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+# Match sets larger than this are scored with one centroid matvec instead of cached rows
+CACHED_ROWS_LIMIT = 32
+
+
+class LRURowCache:
+    """
+    Thread-safe LRU cache of similarity rows keyed by destination index,
+    bounded by the total number of bytes held in the cached arrays.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._rows = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                self.misses += 1
+                return None
+            self._rows.move_to_end(key)
+            self.hits += 1
+            return row
+
+    def put(self, key, row):
+        if row.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            old = self._rows.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old.nbytes
+            self._rows[key] = row
+            self.current_bytes += row.nbytes
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._rows.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._rows.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._rows),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class LazySimilarity:
+    """
+    On-demand cosine similarity backend. Rows are computed only for the
+    destinations a request touches and kept in an LRU cache, so memory is
+    O(N) for the model plus the cache budget.
+    """
+
+    def __init__(self, matrix, cache_bytes=DEFAULT_CACHE_BYTES):
+        self.matrix = normalize(matrix)
+        self.transposed = self.matrix.T.tocsr() if sparse.issparse(self.matrix) else np.ascontiguousarray(self.matrix.T)
+        self.cache = LRURowCache(cache_bytes)
+
+    def row(self, idx):
+        row = self.cache.get(idx)
+        if row is None:
+            row = self.matrix[idx:idx + 1] @ self.transposed
+            if sparse.issparse(row):
+                row = row.toarray()
+            row = np.asarray(row, dtype=np.float32).ravel()
+            row.flags.writeable = False
+            self.cache.put(idx, row)
+        return row
+
+    def scores(self, indexes):
+        """
+        Sum of the similarity rows of the given destinations. Small match sets
+        reuse cached rows; large ones are reduced to a single centroid matvec,
+        which is exact because the rows are L2-normalized:
+            sum_i (x_i . X^T) = (sum_i x_i) . X^T
+        """
+        if len(indexes) <= CACHED_ROWS_LIMIT:
+            combined = np.zeros(self.matrix.shape[0])
+            for idx in indexes:
+                combined += self.row(idx)
+            return combined
+        centroid = np.asarray(self.matrix[indexes].sum(axis=0), dtype=np.float64).ravel()
+        return np.asarray(self.matrix @ centroid, dtype=np.float64).ravel()
+
+    def batch_scores(self, selector):
+        """
+        Scores many match sets at once: selector is a Q x N sparse matrix of
+        per-query weights; each query becomes one weighted centroid and all
+        centroids are scored in a single (Q x F) @ (F x N) product.
+        """
+        centroids = selector @ self.matrix
+        scores = centroids @ self.transposed
+        if sparse.issparse(scores):
+            scores = scores.toarray()
+        return np.asarray(scores, dtype=np.float64)
+
+    def refreshed(self, matrix, unchanged):
+        """
+        New backend for an updated feature matrix; rows are cheap to
+        recompute, so it simply starts with an empty cache.
+        """
+        return LazySimilarity(matrix, self.cache.max_bytes)
+
+    def stats(self):
+        return {"mode": "lazy", **self.cache.stats()}
@@ -0,0 +1,122 @@
+import os
+
+import numpy as np
+from scipy import sparse
+
+# Free-text hits used as the match set when a query matches no name/city/state/country
+TEXT_MATCH_LIMIT = int(os.environ.get("TEXT_MATCH_LIMIT", 10))
+# Pruning compares float sums accumulated in different orders; keep this much headroom
+SLACK = 1e-9
+
+_EMPTY = np.empty(0, dtype=np.intp)
+
+
+def _kth_largest(scores, n):
+    if len(scores) < n:
+        return 0.0
+    return np.partition(scores, len(scores) - n)[len(scores) - n]
+
+
+class TextSearchIndex:
+    """
+    Free-text retrieval over the fitted TF-IDF vectors. The query goes
+    through the same TfidfVectorizer and is scored by cosine (both sides are
+    L2-normalized) against inverted postings: per term, the ids of the
+    documents containing it (sorted) and their weights, i.e. the columns of
+    tfidf_matrix.
+
+    Top-N retrieval prunes with MaxScore. Terms are taken by decreasing
+    upper bound (query weight x the term's largest document weight); their
+    lists are merged until the bounds of the remaining terms add up to less
+    than the current N-th best score, after which no unseen document can
+    make the top N. The remaining lists are then only probed (binary
+    search) for the candidates that can still reach it. Rankings are exact.
+    """
+
+    def __init__(self, tfidf, tfidf_matrix):
+        self.tfidf = tfidf
+        postings = sparse.csc_matrix(tfidf_matrix, dtype=np.float64)
+        postings.sort_indices()
+        self._set_postings(postings)
+
+    @classmethod
+    def from_postings(cls, tfidf, postings):
+        """
+        Wraps already built postings (e.g. memory-mapped from artifacts): a
+        terms x documents csr_matrix with sorted indices.
+        """
+        index = cls.__new__(cls)
+        index.tfidf = tfidf
+        index._set_postings(postings)
+        return index
+
+    def _set_postings(self, postings):
+        # Term t's documents are docs[indptr[t]:indptr[t + 1]], with their weights alongside
+        self.indptr = postings.indptr
+        self.docs = postings.indices
+        self.weights = postings.data
+        self.max_weights = np.zeros(len(self.indptr) - 1)
+        nonempty = np.diff(self.indptr) > 0
+        if nonempty.any():
+            self.max_weights[nonempty] = np.maximum.reduceat(self.weights, self.indptr[:-1][nonempty])
+
+    def postings(self, term):
+        start, stop = self.indptr[term], self.indptr[term + 1]
+        return self.docs[start:stop], self.weights[start:stop]
+
+    def query_terms(self, query):
+        """
+        The query's (term ids, weights) that occur in at least one document.
+        """
+        vector = self.tfidf.transform([query])
+        terms, weights = vector.indices, vector.data
+        known = self.max_weights[terms] > 0
+        return terms[known], weights[known]
+
+    def search(self, query, n, allowed=None):
+        """
+        Row positions of the n documents most similar to the query text, best
+        first, ties by position. Documents sharing no term with the query are
+        never returned.
+        Args:
+            allowed: optional boolean mask; only these positions may be returned
+        """
+        terms, query_weights = self.query_terms(query)
+        if n <= 0 or not len(terms):
+            return _EMPTY
+        bounds = query_weights * self.max_weights[terms]
+        order = np.argsort(-bounds, kind="stable")
+        terms, query_weights = terms[order], query_weights[order]
+        # remaining[i]: best score the terms i.. can add to any document
+        remaining = np.concatenate((np.cumsum(bounds[order][::-1])[::-1], [0.0]))
+
+        # Essential terms: merge whole lists while an unseen document could still make the top n
+        docs, scores = _EMPTY, np.empty(0)
+        threshold = 0.0
+        i = 0
+        while i < len(terms) and (i == 0 or remaining[i] >= threshold - SLACK):
+            term_docs, term_weights = self.postings(terms[i])
+            if allowed is not None:
+                keep = allowed[term_docs]
+                term_docs, term_weights = term_docs[keep], term_weights[keep]
+            docs, inverse = np.unique(np.concatenate([docs, term_docs]), return_inverse=True)
+            scores = np.bincount(inverse, weights=np.concatenate([scores, query_weights[i] * term_weights]),
+                                 minlength=len(docs))
+            threshold = _kth_largest(scores, n)
+            i += 1
+
+        # Non-essential terms: probe their lists for the candidates that can still reach the top n
+        for j in range(i, len(terms)):
+            live = scores + remaining[j] >= threshold - SLACK
+            docs, scores = docs[live], scores[live]
+            term_docs, term_weights = self.postings(terms[j])
+            found = np.minimum(np.searchsorted(term_docs, docs), len(term_docs) - 1)
+            hit = term_docs[found] == docs
+            scores[hit] += query_weights[j] * term_weights[found[hit]]
+            threshold = _kth_largest(scores, n)
+
+        top = np.lexsort((docs, -scores))[:n]
+        return docs[top][scores[top] > 0].astype(np.intp)
+
+    def stats(self):
+        return {"terms": len(self.max_weights), "postings": int(len(self.docs))}
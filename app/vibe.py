@@ -0,0 +1,96 @@
+import os
+
+import numpy as np
+from sklearn.preprocessing import normalize
+
+from app.metrics import stage
+from app.scoring import top_n_stable
+
+# "auto" uses the bucket index when trait vectors repeat a lot, "buckets" or "dense" force one
+VIBE_INDEX = os.environ.get("VIBE_INDEX", "auto")
+# Scores are rounded to this many decimals so mathematically equal cosines
+# (e.g. permuted trait vectors) tie exactly and are resolved by position
+TIE_DECIMALS = 12
+
+
+class VibeIndex:
+    """
+    Exact top-N engine for scoring user trait profiles against every
+    destination by cosine similarity.
+    Trait vectors are L2-normalized once, so a profile costs one matvec.
+    Because traits are small integers, many destinations share the same
+    vector; the bucket index scores each distinct vector once and expands
+    only the winning buckets into their member rows.
+    """
+
+    def __init__(self, traits_matrix, mode=VIBE_INDEX):
+        traits = np.asarray(traits_matrix, dtype=np.float64)
+        self.normed = normalize(traits)
+
+        unique, inverse = np.unique(traits, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        self.bucket_vectors = normalize(unique)
+        # Members of bucket b: self.members[self.starts[b]:self.starts[b + 1]], in row order
+        self.inverse = inverse
+        self.members = np.argsort(inverse, kind="stable")
+        self.counts = np.bincount(inverse, minlength=len(unique))
+        self.starts = np.concatenate(([0], np.cumsum(self.counts)))
+        if mode == "auto":
+            mode = "buckets" if len(unique) * 2 <= len(traits) else "dense"
+        self.mode = mode
+
+    def rank(self, user_scaled, top_n=5, allowed=None):
+        """
+        Row positions of the top_n destinations for one scaled profile, by
+        cosine score, ties by position. allowed optionally restricts the
+        candidates to a boolean mask of rows.
+        """
+        return self.batch_rank(np.asarray(user_scaled).reshape(1, -1), [top_n], [allowed])[0]
+
+    def batch_rank(self, users_scaled, top_ns, alloweds=None):
+        """
+        Ranks many scaled profiles with one matrix product.
+        """
+        users = normalize(np.asarray(users_scaled, dtype=np.float64))
+        vectors = self.normed if self.mode == "dense" else self.bucket_vectors
+        alloweds = alloweds or [None] * len(top_ns)
+        with stage("score"):
+            scores = np.round(users @ vectors.T, TIE_DECIMALS)
+        with stage("top_n"):
+            if self.mode == "dense":
+                return [top_n_stable(row, top_n, allowed) for row, top_n, allowed in zip(scores, top_ns, alloweds)]
+            return [self._expand(row, top_n, allowed) for row, top_n, allowed in zip(scores, top_ns, alloweds)]
+
+    def _expand(self, bucket_scores, top_n, allowed=None):
+        counts = self.counts
+        if allowed is not None:
+            # Only the allowed members count; buckets without any are never chosen
+            counts = np.bincount(self.inverse[allowed], minlength=len(counts))
+            bucket_scores = np.where(counts > 0, bucket_scores, -np.inf)
+        order = np.lexsort((np.arange(len(bucket_scores)), -bucket_scores))
+        # Smallest prefix of buckets holding top_n rows, plus every bucket tied with its last score
+        covered = np.searchsorted(np.cumsum(counts[order]), top_n) + 1
+        if covered < len(order):
+            cutoff = bucket_scores[order[covered - 1]]
+            chosen = np.flatnonzero(bucket_scores >= cutoff)
+        else:
+            chosen = order
+        if len(chosen) > 64:
+            # Many tied buckets (e.g. an all-zero profile): one vectorized pass over the rows
+            wanted = np.zeros(len(counts), dtype=bool)
+            wanted[chosen] = True
+            selected = wanted[self.inverse]
+            if allowed is not None:
+                selected &= allowed
+            rows = np.flatnonzero(selected)
+            row_scores = bucket_scores[self.inverse[rows]]
+        else:
+            rows = np.concatenate([self.members[self.starts[b]:self.starts[b + 1]] for b in chosen])
+            row_scores = np.repeat(bucket_scores[chosen], self.counts[chosen])
+            if allowed is not None:
+                keep = allowed[rows]
+                rows, row_scores = rows[keep], row_scores[keep]
+        return rows[np.lexsort((rows, -row_scores))][:top_n]
+
+    def stats(self):
+        return {"mode": self.mode, "rows": len(self.normed), "buckets": len(self.bucket_vectors)}
@@ -0,0 +1,124 @@
+"""
+Per-worker memory of the gunicorn deployment (Linux only).
+
+Starts gunicorn with gunicorn.conf.py, once with preload_app and once without.
+It sends some warm-up traffic and then reads /proc/<pid>/smaps_rollup for the
+master and every worker. Rss counts shared pages in every process. Pss
+divides them between the processes sharing them, so the sum of Pss is the
+real footprint.
+
+    python -m benchmarks.memory --workers 8 --requests 400
+
+The model is loaded the same way as in production: from MODEL_ARTIFACT_DIR if
+set, otherwise from PostgreSQL (DB_* variables).
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+QUERIES = ["goa", "new york", "temple", "beach", "savannah", "museum", "park", "delhi"]
+FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def smaps_rollup(pid):
+    """
+    Returns {field: MiB} from /proc/<pid>/smaps_rollup.
+    """
+    stats = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0].rstrip(":") in FIELDS:
+                stats[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return stats
+
+def children(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+def request(url, body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=30) as response:
+            return response.read()
+    except urllib.error.HTTPError as e:
+        return e.read()
+
+def wait_until_up(base_url, process, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("gunicorn exited during startup")
+        try:
+            request(base_url + "/")
+            return
+        except OSError:
+            time.sleep(0.5)
+    raise RuntimeError(f"gunicorn did not answer within {timeout}s")
+
+def warm_up(base_url, n_requests):
+    # Every request hits a random worker; spread enough traffic to touch each one
+    headers_bypass = {"X-Cache-Bypass": "1"}
+    for i in range(n_requests):
+        query = QUERIES[i % len(QUERIES)]
+        endpoint = ("/recommend", "/recommend-hybrid", "/recommend-traits", "/suggest")[i % 4]
+        param = "q" if endpoint == "/suggest" else "query"
+        req = urllib.request.Request(f"{base_url}{endpoint}?{param}={urllib.request.quote(query)}", headers=headers_bypass)
+        try:
+            urllib.request.urlopen(req, timeout=30).read()
+        except urllib.error.HTTPError:
+            pass
+    request(base_url + "/recommend-vibe", {"adventure": 5, "relax": 1, "nature": 4, "culture": 0, "luxury": 2})
+
+def measure(preload, workers, n_requests, port, startup_timeout):
+    env = dict(os.environ, GUNICORN_PRELOAD="1" if preload else "0",
+               WEB_CONCURRENCY=str(workers), PORT=str(port), MODEL_REFRESH_INTERVAL="0")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_until_up(base_url, process, startup_timeout)
+        # Without preload each worker loads its own model; wait until all of them serve
+        while len(children(process.pid)) < workers:
+            time.sleep(0.5)
+        warm_up(base_url, n_requests)
+        master = smaps_rollup(process.pid)
+        worker_stats = [smaps_rollup(pid) for pid in children(process.pid)]
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=60)
+    return master, worker_stats
+
+def report(label, master, worker_stats):
+    print(f"\n{label}")
+    print(f"{'process':<10}" + "".join(f"{field:>15}" for field in FIELDS))
+    print(f"{'master':<10}" + "".join(f"{master.get(field, 0):>15.1f}" for field in FIELDS))
+    for i, stats in enumerate(worker_stats):
+        print(f"{f'worker {i}':<10}" + "".join(f"{stats.get(field, 0):>15.1f}" for field in FIELDS))
+    total_pss = master.get("Pss", 0) + sum(stats.get("Pss", 0) for stats in worker_stats)
+    mean_private = sum(stats.get("Private_Dirty", 0) for stats in worker_stats) / max(len(worker_stats), 1)
+    print(f"total Pss: {total_pss:.1f} MiB, mean worker Private_Dirty: {mean_private:.1f} MiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="RSS/PSS per gunicorn worker, with and without preload_app")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--startup-timeout", type=int, default=600)
+    parser.add_argument("--mode", choices=["both", "preload", "no-preload"], default="both")
+    args = parser.parse_args()
+
+    modes = {"both": [True, False], "preload": [True], "no-preload": [False]}[args.mode]
+    for preload in modes:
+        master, worker_stats = measure(preload, args.workers, args.requests, args.port, args.startup_timeout)
+        report(f"preload_app={preload}, {args.workers} workers (MiB)", master, worker_stats)
@@ -0,0 +1,247 @@
+"""
+Offline recommender benchmarks on synthetic catalogs (no PostgreSQL needed).
+
+For every catalog size a fresh process loads the model from a synthetic
+DESTINATIONS_FILE and reports:
+  - model build time and peak RSS (above the interpreter + libraries baseline)
+  - latency (min/mean/p50/p99, pytest-benchmark style) of each recommend_*
+    function and of GET /suggest, for a narrow query (one destination name)
+    and a broad one (a whole country / a single letter), unfiltered and with
+    FILTER_PARAMS applied
+  - latency of free-text retrieval (search=text), GET /recommend-near around
+    a point and around the narrow query's matches, and POST /recommend-batch
+
+    python -m benchmarks.scenarios --sizes 10000,100000,1000000
+
+Peak RSS is compared between consecutive sizes: memory that grows much faster
+than the row count (e.g. a dense N x N matrix sneaking back in) fails the run
+with exit code 1. Generated catalogs are cached in --data-dir.
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import quote
+
+DEFAULT_SIZES = "10000,100000,1000000"
+DEFAULT_DATA_DIR = "/tmp/recommender-bench"
+VIBE_PROFILE = {"adventure": 5, "relax": 1, "nature": 4, "culture": 0, "luxury": 2}
+# Applied on top of the narrow/broad queries, with the countries of both (see pick_queries)
+FILTER_PARAMS = {"min_rating": 4.5, "min_nature": 1, "tags_any": "park,museum,temple"}
+# Free text that matches no destination name, scored against the descriptions
+TEXT_QUERY = "scenic hiking trails with waterfalls and mountain views"
+NEAR_RADIUS_KM = 50
+BATCH_SIZE = 20
+
+
+def peak_rss_mb():
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def bench(fn, rounds, warmup=3):
+    """
+    Calls fn warmup + rounds times and returns timing stats in milliseconds.
+    """
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "min": timings[0],
+        "mean": statistics.fmean(timings),
+        "p50": timings[len(timings) // 2],
+        "p99": timings[min(len(timings) - 1, int(len(timings) * 0.99))],
+        "max": timings[-1],
+        "rounds": rounds,
+    }
+
+def dataset_path(data_dir, rows, seed):
+    return os.path.join(data_dir, f"destinations-{rows}-{seed}.pkl")
+
+def ensure_dataset(data_dir, rows, seed):
+    from benchmarks.synthetic import generate
+
+    path = dataset_path(data_dir, rows, seed)
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        generate(rows, seed).to_pickle(path)
+    return path
+
+def pick_queries(df):
+    """
+    A narrow query (the full name of one destination) and a broad one (the
+    most common country), plus the matching /suggest prefixes.
+    """
+    names = df["name"].str.lower()
+    counts = names.value_counts()
+    narrow = counts[counts == 1].index[0] if (counts == 1).any() else names.iloc[0]
+    broad = df["country"].value_counts().index[0].lower()
+    narrow_country = df["country"][names == narrow].iloc[0].lower()
+    # Center of radius queries: a located destination of the most common city
+    located = df.dropna(subset=["latitude", "longitude"]) if "latitude" in df else df.iloc[:0]
+    city = located["city"].value_counts().index[0] if len(located) else None
+    center = located[located["city"] == city].iloc[0] if city is not None else None
+    return {
+        "narrow": narrow,
+        "broad": broad,
+        "suggest_narrow": narrow[:8],
+        "suggest_broad": "a",
+        "filter_countries": sorted({narrow_country, broad}),
+        "center": None if center is None else [float(center["latitude"]), float(center["longitude"])],
+    }
+
+def batch_items(queries):
+    """
+    BATCH_SIZE /recommend-batch items cycling through every item type, every
+    other cycle filtered.
+    """
+    templates = [
+        {"type": "query", "query": queries["narrow"]},
+        {"type": "hybrid", "query": queries["broad"], "alpha": 0.7},
+        {"type": "traits", "query": queries["narrow"]},
+        {"type": "vibe", "traits": VIBE_PROFILE},
+        {"type": "query", "query": TEXT_QUERY, "search": "text"},
+        {"type": "near", "query": queries["narrow"], "radius_km": NEAR_RADIUS_KM},
+    ]
+    filters = dict(FILTER_PARAMS, country=queries["filter_countries"])
+    return [
+        dict(templates[i % len(templates)], top_n=10, **(filters if i // len(templates) % 2 else {}))
+        for i in range(BATCH_SIZE)
+    ]
+
+def run_child(args):
+    """
+    Runs all scenarios for one catalog size in this process; prints JSON.
+    """
+    # Import the heavy libraries first so the baseline excludes them
+    import numpy  # noqa: F401
+    import pandas  # noqa: F401
+    import scipy.sparse  # noqa: F401
+    import sklearn.feature_extraction.text  # noqa: F401
+    import flask  # noqa: F401
+    baseline = peak_rss_mb()
+
+    os.environ["DESTINATIONS_FILE"] = dataset_path(args.data_dir, args.rows, args.seed)
+    os.environ["RESPONSE_CACHE"] = "off"
+    os.environ["MODEL_REFRESH_INTERVAL"] = "0"
+    started = time.perf_counter()
+    from app import recommender
+    from app.filters import parse_filters
+    build_seconds = time.perf_counter() - started
+    build_peak = peak_rss_mb()
+    from app.app import app
+
+    m = recommender.current_model()
+    queries = pick_queries(m.df)
+    client = app.test_client()
+    rounds = args.rounds
+    results = {}
+    filters = parse_filters(dict(FILTER_PARAMS, country=queries["filter_countries"]))
+    for width in ("narrow", "broad"):
+        query = queries[width]
+        results[f"recommend_by_query[{width}]"] = bench(lambda: recommender.recommend_by_query(query), rounds)
+        results[f"recommend_by_traits[{width}]"] = bench(lambda: recommender.recommend_by_traits(query), rounds)
+        results[f"recommend_hybrid[{width}]"] = bench(lambda: recommender.recommend_hybrid(query), rounds)
+        results[f"recommend_hybrid[{width}, filtered]"] = bench(
+            lambda: recommender.recommend_hybrid(query, filters=filters), rounds)
+        prefix = queries[f"suggest_{width}"]
+        results[f"GET /suggest[{width}]"] = bench(lambda: client.get(f"/suggest?q={prefix}"), rounds)
+    results["recommend_by_vibe"] = bench(lambda: recommender.recommend_by_vibe(VIBE_PROFILE), rounds)
+    results["recommend_by_vibe[filtered]"] = bench(
+        lambda: recommender.recommend_by_vibe(VIBE_PROFILE, filters=filters), rounds)
+    results["recommend_by_query[search=text]"] = bench(
+        lambda: recommender.recommend_by_query(TEXT_QUERY, search="text"), rounds)
+    results["recommend_hybrid[search=text]"] = bench(
+        lambda: recommender.recommend_hybrid(TEXT_QUERY, search="text"), rounds)
+
+    if queries["center"]:
+        lat, lon = queries["center"]
+        results["GET /recommend-near[point]"] = bench(
+            lambda: client.get(f"/recommend-near?lat={lat}&lon={lon}&radius_km={NEAR_RADIUS_KM}&top_n=10"), rounds)
+    near = f"/recommend-near?query={quote(queries['narrow'])}&radius_km={NEAR_RADIUS_KM}&top_n=10"
+    results["GET /recommend-near[narrow]"] = bench(lambda: client.get(near), rounds)
+    body = {"queries": batch_items(queries)}
+    results[f"POST /recommend-batch[{BATCH_SIZE}]"] = bench(lambda: client.post("/recommend-batch", json=body), rounds)
+
+    print(json.dumps({
+        "rows": args.rows,
+        "similarity_mode": os.environ.get("SIMILARITY_MODE", "neighbors"),
+        "build_seconds": build_seconds,
+        "baseline_rss_mb": baseline,
+        "peak_rss_mb": peak_rss_mb(),
+        "model_rss_mb": build_peak - baseline,
+        "queries": queries,
+        "scenarios": results,
+    }))
+
+def run_size(args, rows):
+    command = [sys.executable, "-m", "benchmarks.scenarios", "--child", "--rows", str(rows),
+               "--rounds", str(args.rounds), "--seed", str(args.seed), "--data-dir", args.data_dir]
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    # The model load may print; the report is the last line
+    return json.loads(output.strip().splitlines()[-1])
+
+def report(result):
+    print(f"\n=== {result['rows']} rows ({result['similarity_mode']}) ===")
+    print(f"build: {result['build_seconds']:.2f}s, model RSS: {result['model_rss_mb']:.1f} MiB, "
+          f"peak RSS: {result['peak_rss_mb']:.1f} MiB")
+    print(f"{'scenario':<40}{'min':>10}{'mean':>10}{'p50':>10}{'p99':>10}  (ms)")
+    for name, stats in result["scenarios"].items():
+        print(f"{name:<40}{stats['min']:>10.3f}{stats['mean']:>10.3f}{stats['p50']:>10.3f}{stats['p99']:>10.3f}")
+
+def check_growth(results, max_growth):
+    """
+    Returns messages for consecutive sizes whose model RSS grew more than
+    max_growth times faster than the row count.
+    """
+    problems = []
+    for small, large in zip(results, results[1:]):
+        row_ratio = large["rows"] / small["rows"]
+        rss_ratio = large["model_rss_mb"] / max(small["model_rss_mb"], 1.0)
+        if rss_ratio > max_growth * row_ratio:
+            problems.append(
+                f"{small['rows']} -> {large['rows']} rows: model RSS x{rss_ratio:.1f} for x{row_ratio:.0f} rows"
+            )
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline recommender benchmarks on synthetic catalogs")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated catalog sizes")
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    parser.add_argument("--max-growth", type=float, default=1.5,
+                        help="Fail if model RSS grows this many times faster than the rows")
+    parser.add_argument("--json", help="Also write all results to this file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--rows", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        sys.exit(0)
+
+    results = []
+    for rows in [int(size) for size in args.sizes.split(",")]:
+        ensure_dataset(args.data_dir, rows, args.seed)
+        result = run_size(args, rows)
+        report(result)
+        results.append(result)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    problems = check_growth(results, args.max_growth)
+    for problem in problems:
+        print(f"❌ Superlinear memory growth: {problem}")
+    sys.exit(1 if problems else 0)
@@ -0,0 +1,193 @@
+"""
+Synthetic destinations catalog for offline benchmarks.
+
+Rows are sampled from the scraped datasets in datasets/*.csv. Names,
+categories, tags, cities, states and countries keep the empirical
+frequencies of those files. Descriptions reuse the per-category description
+templates and add sentences from the Holidify city descriptions, so the
+TF-IDF vocabulary grows with the catalog like real text does. Traits follow
+a per-category profile. Like the real table, a share of the rows still
+carries the placeholder traits assigned by DB/load_data.py. Ratings come
+with the sampled place; coordinates scatter around a random center per city
+inside its country's bounding box, and a share of rows has none.
+
+    python -m benchmarks.synthetic --rows 100000 --out /tmp/destinations-100k.pkl
+
+The output is a pickled DataFrame with the columns of the destinations
+table; point DESTINATIONS_FILE at it to serve it without PostgreSQL.
+"""
+import argparse
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+DATASETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "datasets")
+SOURCES = ["cleaned_data_USA_with_descriptions.csv", "cleaned_data_India.csv", "cleaned_data_Iran.csv"]
+TRAIT_COLS = ["adventure", "relax", "nature", "culture", "luxury"]
+
+# Mean keyword hits per trait for each broader_category of the scraped data
+TRAIT_PROFILES = {
+    "Nature": (2.0, 1.5, 3.0, 0.5, 0.3),
+    "Cultural": (0.3, 0.5, 0.5, 3.0, 0.5),
+    "Entertainment": (1.5, 1.0, 0.5, 1.0, 1.2),
+    "Religious": (0.2, 1.5, 0.3, 3.0, 0.2),
+}
+DEFAULT_PROFILE = (1.0, 1.0, 1.0, 1.0, 1.0)
+# Placeholder traits of DB/load_data.py and the share of rows never enriched
+PLACEHOLDER_TRAITS = (2, 3, 3, 4, 2)
+PLACEHOLDER_SHARE = 0.3
+MAX_TRAIT = 8
+
+# (min lat, max lat, min lon, max lon) of each source country; cities are placed inside
+COUNTRY_BOUNDS = {
+    "USA": (25.0, 49.0, -124.0, -67.0),
+    "India": (8.0, 34.0, 68.0, 97.0),
+    "Iran": (25.0, 39.5, 44.0, 63.0),
+}
+WORLD_BOUNDS = (-60.0, 70.0, -180.0, 180.0)
+# Spread of a city's destinations around its center, in km (1 degree of latitude ~ 111 km)
+CITY_SPREAD_KM = 15.0
+# Rows left without coordinates (the real table only has them where a dataset provides them)
+MISSING_COORDINATES_SHARE = 0.2
+
+# Used for rows whose source has no description
+CATEGORY_TEMPLATES = {
+    "Nature": "{name} in {place} is a beautiful natural attraction perfect for outdoor lovers and scenic experiences.",
+    "Cultural": "{name} in {place} offers a rich cultural experience, showcasing local heritage and history.",
+    "Entertainment": "{name} in {place} is a fun-filled destination with exciting activities and entertainment options.",
+    "Religious": "{name} in {place} is a spiritual site known for its peaceful atmosphere and devotion.",
+}
+DEFAULT_TEMPLATE = "{name} in {place} is a popular {category} worth a visit."
+
+
+def load_reference(datasets_dir=DATASETS_DIR):
+    """
+    The scraped places of all countries as one DataFrame.
+    """
+    frames = []
+    for file_name in SOURCES:
+        frame = pd.read_csv(os.path.join(datasets_dir, file_name))
+        if "description" not in frame:
+            frame["description"] = None
+        frames.append(frame[["name", "main_category", "categories", "city", "state", "country",
+                             "broader_category", "description", "rating"]])
+    reference = pd.concat(frames, ignore_index=True)
+    reference["name"] = reference["name"].str.strip()
+    return reference.dropna(subset=["name", "city", "country"]).reset_index(drop=True)
+
+def load_sentences(datasets_dir=DATASETS_DIR):
+    """
+    Sentences of the Holidify city descriptions, used to vary description text.
+    """
+    holidify = pd.read_csv(os.path.join(datasets_dir, "holidify.csv"))
+    text = " ".join(holidify["About the city (long Description)"].dropna().str.replace("...", ".", regex=False))
+    return [s.strip() for s in re.split(r"(?<=[.!?])\s+", text) if len(s.split()) >= 5]
+
+def template_for(row):
+    """
+    The description of a reference row with its name and place turned into
+    placeholders, or the category template when it has none.
+    """
+    description = row["description"]
+    place = f"{row['city']}, {row['state']}" if isinstance(row["state"], str) else row["city"]
+    if isinstance(description, str) and row["name"] in description:
+        description = description.replace("{", "{{").replace("}", "}}")
+        name = row["name"].replace("{", "{{").replace("}", "}}")
+        return description.replace(name, "{name}", 1).replace(place, "{place}", 1)
+    return CATEGORY_TEMPLATES.get(row["broader_category"], DEFAULT_TEMPLATE)
+
+def generate(n_rows, seed=0, datasets_dir=DATASETS_DIR):
+    """
+    Builds a synthetic destinations DataFrame with n_rows rows (columns of
+    the destinations table: id, name, city, state, country, description,
+    tags, the five traits, rating, latitude and longitude).
+    """
+    rng = np.random.default_rng(seed)
+    reference = load_reference(datasets_dir)
+    sentences = load_sentences(datasets_dir)
+    templates = [template_for(row) for _, row in reference.iterrows()]
+    tags = reference["categories"].fillna("").apply(lambda x: [t.strip() for t in x.split(",") if t.strip()]).tolist()
+    name_words = sorted({word for name in reference["name"] for word in name.split() if word.isalpha()})
+
+    # What the place is (name, category, tags, description) comes from one reference row,
+    # where it is from (city, state) from another row of the same country
+    kind = rng.integers(0, len(reference), n_rows)
+    countries = reference["country"].to_numpy()[kind]
+    place = np.empty(n_rows, dtype=np.int64)
+    for country, members in reference.groupby("country").indices.items():
+        rows = np.flatnonzero(countries == country)
+        place[rows] = members[rng.integers(0, len(members), len(rows))]
+
+    city = reference["city"].to_numpy()[place]
+    state = reference["state"].to_numpy()[place]
+    base_names = reference["name"].to_numpy()[kind]
+    variant = rng.random(n_rows)
+    extra_words = np.asarray(name_words, dtype=object)[rng.integers(0, len(name_words), n_rows)]
+    names = [
+        base if v < 0.4 else f"{c} {base}" if v < 0.7 else f"{base} {w}"
+        for base, c, w, v in zip(base_names, city, extra_words, variant)
+    ]
+
+    n_sentences = rng.poisson(1.0, n_rows)
+    sentence_ids = rng.integers(0, len(sentences), n_sentences.sum())
+    offsets = np.concatenate(([0], np.cumsum(n_sentences)))
+    categories = reference["main_category"].fillna("place").to_numpy()[kind]
+    descriptions = []
+    for i in range(n_rows):
+        where = f"{city[i]}, {state[i]}" if isinstance(state[i], str) else city[i]
+        text = templates[kind[i]].format(name=names[i], place=where, category=str(categories[i]).lower())
+        extra = [sentences[j] for j in sentence_ids[offsets[i]:offsets[i + 1]]]
+        descriptions.append(" ".join([text] + extra))
+
+    profiles = np.asarray([
+        TRAIT_PROFILES.get(category, DEFAULT_PROFILE) for category in reference["broader_category"]
+    ])[kind]
+    traits = np.minimum(rng.poisson(profiles), MAX_TRAIT)
+    traits[rng.random(n_rows) < PLACEHOLDER_SHARE] = PLACEHOLDER_TRAITS
+
+    df = pd.DataFrame({
+        "id": np.arange(1, n_rows + 1),
+        "name": names,
+        "city": city,
+        "state": state,
+        "country": countries,
+        "description": descriptions,
+        "tags": [list(tags[i]) for i in kind],
+    })
+    for j, trait in enumerate(TRAIT_COLS):
+        df[trait] = traits[:, j]
+    df["rating"] = reference["rating"].to_numpy(dtype=np.float64)[kind]
+    df["latitude"], df["longitude"] = coordinates(countries, city, rng)
+    return df
+
+def coordinates(countries, cities, rng):
+    """
+    Per row (latitude, longitude) arrays: a uniform center per (country,
+    city) inside COUNTRY_BOUNDS plus CITY_SPREAD_KM of normal jitter, NaN
+    for MISSING_COORDINATES_SHARE of the rows.
+    """
+    keys = pd.MultiIndex.from_arrays([countries, cities])
+    codes, uniques = pd.factorize(keys)
+    bounds = np.asarray([COUNTRY_BOUNDS.get(country, WORLD_BOUNDS) for country, _ in uniques])
+    center_lat = rng.uniform(bounds[:, 0], bounds[:, 1])
+    center_lon = rng.uniform(bounds[:, 2], bounds[:, 3])
+    spread = CITY_SPREAD_KM / 111.0
+    lat = np.clip(center_lat[codes] + rng.normal(0, spread, len(codes)), -90, 90)
+    lon = center_lon[codes] + rng.normal(0, spread, len(codes)) / np.cos(np.radians(lat)).clip(0.1)
+    lon = (lon + 180) % 360 - 180
+    missing = rng.random(len(codes)) < MISSING_COORDINATES_SHARE
+    return np.where(missing, np.nan, lat), np.where(missing, np.nan, lon)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic destinations catalog")
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--out", required=True, help="Output pickle path")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    df = generate(args.rows, args.seed)
+    df.to_pickle(args.out)
+    print(f"✅ Wrote {len(df)} synthetic destinations to {args.out}")
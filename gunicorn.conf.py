@@ -0,0 +1,21 @@
+import gc
+import os
+
+# gunicorn -c gunicorn.conf.py
+# With preload_app the master imports the app (and so builds or memory-maps the
+# model) once, and the workers are forked from it. The numpy buffers are then
+# shared copy-on-write between all workers instead of being rebuilt in each one.
+# MODEL_REFRESH_INTERVAL runs a refresher in every worker: once the catalog
+# changes, each worker rebuilds a private model (see app/refresh.py), so use
+# MODEL_ARTIFACT_DIR refreshes to keep the matrices shared.
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 8))
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1"
+wsgi_app = "app.app:create_app()"
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+
+
+def pre_fork(server, worker):
+    # Move everything allocated so far to the permanent generation, so the
+    # workers' garbage collector never writes to (and copies) those pages
+    gc.freeze()